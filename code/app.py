@@ -1,22 +1,13 @@
 # app.py - Main entry point for Adaptive Learning Platform
 import streamlit as st
 import datetime
-from modules.auth import authenticate, create_user, change_password
+from modules.auth import LOGIN_THROTTLED, authenticate, create_user, change_password
 from modules.session import initialize_session, check_session_valid, end_session
 from modules.jwt_auth import generate_token, verify_token
+from modules.rbac import ROLE_PAGES, can_view_page
 
-# Import page modules
-from pages.common.dashboard import display_dashboard
-from pages.admin.user_management import display_user_management
-from pages.admin.system_settings import display_system_settings
-from pages.teacher.class_management import display_class_management
-from pages.teacher.student_progress import display_student_progress
-from pages.teacher.content_management import display_content_management
-from pages.teacher.analytics import display_analytics
-from pages.student.learning_path import display_learning_path
-from pages.student.performance import display_student_performance
-from pages.student.schedule import display_schedule
-from pages.student.resources import display_resources
+# Page modules are imported lazily, on first visit (see pages/__init__.py)
+from pages import PAGE_REGISTRY, load_page
 
 # Set page configuration
 st.set_page_config(
@@ -49,7 +40,9 @@ def login_ui():
 
         if st.button("Login"):
             if username and password:
-                success, role = authenticate(username, password)
+                # Rate-limit per client IP as well as per username; a session id would not
+                # do, since reloading the page starts a new session with a fresh bucket
+                success, role = authenticate(username, password, client_id=st.context.ip_address)
                 if success:
                     # Generate JWT token
                     token = generate_token(username, role)
@@ -63,6 +56,8 @@ def login_ui():
 
                     st.success(f"Welcome back, {username}!")
                     st.rerun()
+                elif role == LOGIN_THROTTLED:
+                    st.error("Too many login attempts. Please wait a moment and try again.")
                 else:
                     st.error("Invalid username or password")
             else:
@@ -104,22 +99,8 @@ def main_app():
     st.sidebar.write(f"Logged in as: {st.session_state.username}")
     st.sidebar.write(f"Role: {st.session_state.role}")
 
-    # Different navigation options based on role
-    if st.session_state.role == "admin":
-        page = st.sidebar.selectbox(
-            "Navigate",
-            ["Dashboard", "User Management", "Course Management", "System Settings"]
-        )
-    elif st.session_state.role == "teacher":
-        page = st.sidebar.selectbox(
-            "Navigate",
-            ["Dashboard", "Class Management", "Student Progress", "Content Management", "Analytics"]
-        )
-    else:  # student
-        page = st.sidebar.selectbox(
-            "Navigate",
-            ["Dashboard", "My Learning Path", "Performance", "Schedule", "Resources"]
-        )
+    # Navigation options based on role (see PAGE_PERMISSIONS in modules/rbac.py)
+    page = st.sidebar.selectbox("Navigate", ROLE_PAGES.get(st.session_state.role, ()))
 
     # Account settings and logout
     st.sidebar.markdown("---")
@@ -132,6 +113,8 @@ def main_app():
             if new_password == confirm_new:
                 success, message = change_password(st.session_state.username, old_password, new_password)
                 if success:
+                    # Earlier tokens were revoked with the old password; reissue this one
+                    st.session_state.token = generate_token(st.session_state.username, st.session_state.role)
                     st.sidebar.success(message)
                 else:
                     st.sidebar.error(message)
@@ -142,30 +125,12 @@ def main_app():
         logout()
 
     # Page routing - dispatch to appropriate page module
-    if page == "Dashboard":
-        display_dashboard()
-    elif page == "User Management" and st.session_state.role == "admin":
-        display_user_management()
-    elif page == "Class Management" and st.session_state.role == "teacher":
-        display_class_management()
-    elif page == "Student Progress" and st.session_state.role == "teacher":
-        display_student_progress()
-    elif page == "My Learning Path" and st.session_state.role == "student":
-        display_learning_path()
-    elif page == "Performance" and st.session_state.role == "student":
-        display_student_performance()
-    elif page == "Schedule":
-        display_schedule()
-    elif page == "Resources" and st.session_state.role == "student":
-        display_resources()
-    elif page == "Content Management" and st.session_state.role == "teacher":
-        display_content_management()
-    elif page == "Analytics" and (st.session_state.role == "teacher" or st.session_state.role == "admin"):
-        display_analytics()
-    elif page == "System Settings" and st.session_state.role == "admin":
-        display_system_settings()
-    else:
+    if not can_view_page(st.session_state.role, page):
         st.error("You don't have permission to access this page")
+    elif page in PAGE_REGISTRY:
+        load_page(page)()
+    else:
+        st.info(f"{page} is not available yet.")
 
 
 # Main logic with session validation
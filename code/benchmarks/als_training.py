@@ -0,0 +1,103 @@
+# als_training.py - Implicit ALS training time, memory and top-k serving at OULAD scale
+# Run from the code/ directory: python -m benchmarks.als_training [rows] [iterations]
+import os
+import sys
+import time
+import tracemalloc
+import numpy as np
+import pandas as pd
+from modules.collaborative_filtering import ALS_WORKERS, ImplicitALSRecommender, build_click_matrix
+from modules.offline_eval import OULAD_DIR, iter_student_vle
+
+# OULAD: 22 module presentations, 6,364 VLE materials, 32,593 student registrations
+PRESENTATIONS = 22
+SITES = 6364
+STUDENTS = 32593
+CHUNK_ROWS = 1_000_000
+SERVE_STUDENTS = 10000
+HOLDOUT_STUDENTS = 2000
+
+
+def synthetic_chunks(rows, rng):
+    """studentVle-like chunks: each student clicks materials of their own presentation, some far more than others"""
+    student_presentation = rng.integers(0, PRESENTATIONS, STUDENTS)
+    sites_per_presentation = SITES // PRESENTATIONS
+    # Per-student taste over their presentation's materials
+    taste = rng.integers(0, sites_per_presentation, STUDENTS)
+    for start in range(0, rows, CHUNK_ROWS):
+        n = min(CHUNK_ROWS, rows - start)
+        students = rng.integers(0, STUDENTS, n)
+        offset = (taste[students] + rng.zipf(1.6, n)) % sites_per_presentation
+        yield pd.DataFrame({
+            "id_student": students,
+            "id_site": student_presentation[students] * sites_per_presentation + offset,
+            "sum_click": rng.geometric(0.4, n),
+        })
+
+
+def holdout(matrix, rng):
+    """Move one clicked material per sampled student out of the matrix; returns (train, [(row, column)])"""
+    matrix = matrix.tolil(copy=True)
+    pairs = []
+    for row in rng.choice(matrix.shape[0], HOLDOUT_STUDENTS, replace=False):
+        columns = matrix.rows[row]
+        if len(columns) > 1:
+            column = columns[rng.integers(len(columns))]
+            matrix[row, column] = 0
+            pairs.append((row, column))
+    matrix = matrix.tocsr()
+    matrix.eliminate_zeros()
+    return matrix, pairs
+
+
+def main(rows=10_600_000, iterations=10):
+    rng = np.random.default_rng(0)
+    path = os.path.join(OULAD_DIR, "studentVle.csv")
+    start = time.perf_counter()
+    tracemalloc.start()
+    if os.path.exists(path):
+        print(f"Building the click matrix from {path}")
+        matrix, student_ids, site_ids = build_click_matrix(iter_student_vle(path))
+    else:
+        print(f"studentVle.csv not found in {OULAD_DIR}; using a synthetic {rows:,}-row log")
+        matrix, student_ids, site_ids = build_click_matrix(synthetic_chunks(rows, rng))
+    build_peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print(f"Click matrix: {matrix.shape[0]:,} students x {matrix.shape[1]:,} materials, {matrix.nnz:,} nonzeros "
+          f"({time.perf_counter() - start:.1f} s, peak {build_peak / 1e6:.0f} MB while building)")
+
+    train, pairs = holdout(matrix, rng)
+    for workers in sorted({1, ALS_WORKERS}):
+        recommender = ImplicitALSRecommender(site_ids.tolist(), iterations=iterations, workers=workers,
+                                             rng=np.random.default_rng(1))
+        tracemalloc.start()
+        stats = recommender.fit(train, student_ids)
+        fit_peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print(f"Training, {workers} worker(s): {stats['seconds']:.1f} s "
+              f"({np.mean(stats['iteration_seconds']):.2f} s per iteration), "
+              f"matrices {stats['matrix_bytes'] / 1e6:.0f} MB, factors {stats['factor_bytes'] / 1e6:.1f} MB, "
+              f"peak {fit_peak / 1e6:.0f} MB")
+
+    served = student_ids[:SERVE_STUDENTS].tolist()
+    start = time.perf_counter()
+    recommender.recommend_batch(served, k=10)
+    elapsed = time.perf_counter() - start
+    print(f"Top-10 serving: {len(served) / elapsed:,.0f} students/sec")
+
+    # Recall@10 of one held-out click per student, against recommending the most used materials
+    top = recommender.recommend_batch([student_ids[row] for row, _ in pairs], k=10)
+    items = recommender.content_items
+    als_hits = sum(items[column] in top[student_ids[row]] for row, column in pairs)
+    popular = recommender.popularity.copy()
+    popular_hits = 0
+    for row, column in pairs:
+        scores = popular.copy()
+        scores[train.indices[train.indptr[row]:train.indptr[row + 1]]] = -np.inf
+        popular_hits += column in np.argpartition(-scores, 10)[:10]
+    print(f"Recall@10 on {len(pairs)} held-out clicks: ALS {als_hits / len(pairs):.3f}, "
+          f"popularity {popular_hits / len(pairs):.3f}")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:3]))
@@ -0,0 +1,71 @@
+# bandit_recovery.py - Startup recovery time for durable bandit state on a 10M-event reward log
+# Run from the code/ directory: python -m benchmarks.bandit_recovery [events] [items]
+import os
+import sys
+import json
+import time
+import shutil
+import tempfile
+import numpy as np
+from modules.bandit_store import LOG_DTYPE, BanditStateStore
+from modules.recommender import MultiArmedBanditRecommender
+
+TAIL_EVENTS = 1_000_000
+APPEND_EVENTS = 200_000
+
+
+def write_log(directory, generation, events, catalog_size, rng):
+    records = np.empty(events, dtype=LOG_DTYPE)
+    records["item"] = rng.integers(0, catalog_size, events)
+    records["reward"] = rng.random(events) < 0.3
+    records.tofile(os.path.join(directory, f"{generation:08d}.log"))
+
+
+def recover(directory, items):
+    """Open the store and load a recommender, as app startup would"""
+    start = time.perf_counter()
+    store = BanditStateStore(directory, snapshot_every=sys.maxsize)
+    recommender = MultiArmedBanditRecommender(items, state_store=store)
+    return store, recommender, time.perf_counter() - start
+
+
+def main(events=10_000_000, catalog_size=6000):
+    rng = np.random.default_rng(0)
+    items = [f"site{i}" for i in range(catalog_size)]
+    directory = tempfile.mkdtemp(prefix="bandit_recovery_")
+    try:
+        with open(os.path.join(directory, "items.jsonl"), "w") as f:
+            f.writelines(json.dumps(item) + "\n" for item in items)
+        write_log(directory, 0, events, catalog_size, rng)
+        log_mb = os.path.getsize(os.path.join(directory, "00000000.log")) / 1e6
+        print(f"{events:,} logged events ({log_mb:.0f} MB), {catalog_size} items")
+
+        store, recommender, elapsed = recover(directory, items)
+        assert recommender.total_attempts == events
+        print(f"Replay full log:            {elapsed:6.3f} s ({events / elapsed:,.0f} events/sec)")
+
+        start = time.perf_counter()
+        store.snapshot()
+        print(f"Write snapshot:             {time.perf_counter() - start:6.3f} s")
+        store.close()
+
+        _, _, elapsed = recover(directory, items)
+        print(f"Snapshot only:              {elapsed:6.3f} s")
+
+        write_log(directory, store.generation, TAIL_EVENTS, catalog_size, rng)
+        store, recommender, elapsed = recover(directory, items)
+        assert recommender.total_attempts == events + TAIL_EVENTS
+        print(f"Snapshot + {TAIL_EVENTS:,} tail:    {elapsed:6.3f} s")
+
+        start = time.perf_counter()
+        for index in rng.integers(0, catalog_size, APPEND_EVENTS):
+            recommender.update_reward(items[index], 1.0)
+        store.flush()
+        print(f"update_reward with logging: {APPEND_EVENTS / (time.perf_counter() - start):,.0f} events/sec")
+        store.close()
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:3]))
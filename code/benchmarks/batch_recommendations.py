@@ -0,0 +1,61 @@
+# batch_recommendations.py - recommend_batch() throughput versus scoring students one at a time
+# Run from the code/ directory: python -m benchmarks.batch_recommendations [students] [items] [k]
+import sys
+import time
+import numpy as np
+from modules.recommender import MultiArmedBanditRecommender
+
+CONSUMED_PER_STUDENT = 50
+LOOP_SAMPLE = 500  # students timed for the per-student baseline
+
+
+def per_student_top_k(recommender, student_ids, k, consumed):
+    """Baseline: score the catalog and mask consumed items separately for each student"""
+    items = recommender.content_items
+    result = {}
+    for student_id in student_ids:
+        scores = recommender.ucb_scores()
+        scores[[recommender.item_index[item] for item in consumed.get(student_id, ())]] = -np.inf
+        top = np.argpartition(-scores, k - 1)[:k]
+        result[student_id] = [items[i] for i in top[np.argsort(-scores[top])]]
+    return result
+
+
+def main(students=10000, catalog_size=5000, k=3):
+    rng = np.random.default_rng(0)
+    items = [f"site{i}" for i in range(catalog_size)]
+    recommender = MultiArmedBanditRecommender(items)
+    for index in rng.integers(0, catalog_size, catalog_size * 20):
+        recommender.update_reward(items[index], float(rng.random() < 0.3))
+    for item in items:
+        recommender.update_reward(item, 0.0)  # make sure every item has been tried
+
+    student_ids = list(range(students))
+    consumed = {
+        student_id: [items[i] for i in rng.choice(catalog_size, CONSUMED_PER_STUDENT, replace=False)]
+        for student_id in student_ids
+    }
+
+    start = time.perf_counter()
+    batch = recommender.recommend_batch(student_ids, k=k, consumed=consumed, rng=rng)
+    batch_elapsed = time.perf_counter() - start
+
+    sample = student_ids[:LOOP_SAMPLE]
+    start = time.perf_counter()
+    looped = per_student_top_k(recommender, sample, k, consumed)
+    loop_rate = len(sample) / (time.perf_counter() - start)
+    # Same scores as the baseline (tied items may be picked in a different order)
+    ucb = recommender.ucb_scores().astype(np.float32)
+    for student_id in sample:
+        assert [ucb[recommender.item_index[item]] for item in batch[student_id]] == \
+            [ucb[recommender.item_index[item]] for item in looped[student_id]]
+
+    print(f"{students} students x {catalog_size} items, top {k}, {CONSUMED_PER_STUDENT} consumed items each")
+    print(f"recommend_batch: {batch_elapsed:6.2f} s ({students / batch_elapsed:10,.0f} students/sec)")
+    print(f"Per-student:     {students / loop_rate:6.2f} s ({loop_rate:10,.0f} students/sec, "
+          f"extrapolated from {len(sample)})")
+    print(f"Speedup: {students / batch_elapsed / loop_rate:.1f}x")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:4]))
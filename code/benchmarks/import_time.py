@@ -0,0 +1,101 @@
+# import_time.py - Import-time budget for the login screen versus eagerly importing every page
+# Run from the code/ directory: python -m benchmarks.import_time [budget_ms]
+import os
+import sys
+import subprocess
+from pages import PAGE_REGISTRY
+
+# What app.py imports before the login screen can render
+LOGIN_PATH_MODULES = [
+    "streamlit",
+    "modules.auth",
+    "modules.session",
+    "modules.jwt_auth",
+    "modules.rate_limiter",
+    "pages",
+]
+
+CODE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def import_times(modules, repeat=3):
+    """
+    Import `modules` in a fresh interpreter under -X importtime
+
+    Returns [(module, self_us, cumulative_us, depth)] in import order, taking
+    the fastest of `repeat` runs per module.
+    """
+    best = {}
+    order = []
+    for _ in range(repeat):
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", "import " + ", ".join(modules)],
+            cwd=CODE_DIR, capture_output=True, text=True, check=True,
+        )
+        for line in result.stderr.splitlines():
+            if not line.startswith("import time:") or "imported package" in line:
+                continue
+            self_us, cumulative_us, name = line[len("import time:"):].split("|")
+            depth = (len(name) - len(name.lstrip()) - 1) // 2
+            name = name.strip()
+            if name not in best:
+                order.append(name)
+                best[name] = (int(self_us), int(cumulative_us), depth)
+            else:
+                best[name] = min(best[name], (int(self_us), int(cumulative_us), depth))
+    return [(name, *best[name]) for name in order]
+
+
+def _top_level_ms(times, after):
+    """Cumulative ms of top-level imports that follow the last of the `after` modules"""
+    start = 0
+    for i, (name, _, _, depth) in enumerate(times):
+        if depth == 0 and name in after:
+            start = i + 1
+    return sum(cumulative for _, _, cumulative, depth in times[start:] if depth == 0) / 1000
+
+
+def import_budget_report(modules, budget_ms=None, top=10):
+    """Total import time for `modules`, the heaviest imports, and whether it fits the budget"""
+    times = import_times(modules)
+    # Skip what the interpreter imports at startup (site, encodings, ...)
+    first = next(i for i, (name, _, _, depth) in enumerate(times) if depth == 0 and name in modules)
+    times = times[first:]
+    total_ms = _top_level_ms(times, after=())
+    heaviest = sorted(times, key=lambda t: t[1], reverse=True)[:top]
+    return {
+        "total_ms": total_ms,
+        "module_count": len(times),
+        "budget_ms": budget_ms,
+        "within_budget": budget_ms is None or total_ms <= budget_ms,
+        "heaviest": [(name, self_us / 1000, cumulative_us / 1000) for name, self_us, cumulative_us, _ in heaviest],
+    }
+
+
+def page_import_ms(module):
+    """Extra import time for a page module once the login path is loaded"""
+    return _top_level_ms(import_times(LOGIN_PATH_MODULES + [module]), after=set(LOGIN_PATH_MODULES))
+
+
+def main(budget_ms=None):
+    login = import_budget_report(LOGIN_PATH_MODULES, budget_ms)
+    page_modules = sorted({module for module, _ in PAGE_REGISTRY.values()})
+    # Measured in one interpreter so run-to-run noise doesn't swamp the difference
+    pages_ms = _top_level_ms(import_times(LOGIN_PATH_MODULES + page_modules), after=set(LOGIN_PATH_MODULES))
+
+    print(f"Login path:                    {login['total_ms']:8.1f} ms, {login['module_count']} modules")
+    print(f"Eager page imports (deferred): {pages_ms:8.1f} ms")
+    if budget_ms is not None:
+        print(f"Budget {budget_ms:.0f} ms: {'OK' if login['within_budget'] else 'EXCEEDED'}")
+
+    print("\nHeaviest imports on the login path (self / cumulative ms):")
+    for name, self_ms, cumulative_ms in login["heaviest"]:
+        print(f"  {name:45s} {self_ms:8.1f} {cumulative_ms:8.1f}")
+
+    print("\nFirst visit cost per page, on top of the login path:")
+    for label, (module, _) in PAGE_REGISTRY.items():
+        print(f"  {label:20s} {page_import_ms(module):8.1f} ms")
+
+
+if __name__ == "__main__":
+    main(float(sys.argv[1]) if len(sys.argv) > 1 else None)
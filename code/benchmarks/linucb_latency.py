@@ -0,0 +1,55 @@
+# linucb_latency.py - LinUCB per-update and per-recommendation latency as the catalog grows
+# Run from the code/ directory: python -m benchmarks.linucb_latency [updates]
+import sys
+import time
+import numpy as np
+from modules.preference_store import PREFERENCE_OPTIONS
+from modules.recommender import INTERACTION_FEATURES, LinUCBRecommender, context_vector
+
+ARM_COUNTS = [100, 1000, 6000]
+
+
+def random_profile(rng):
+    profile = {field: rng.choice(options) for field, options in PREFERENCE_OPTIONS.items()}
+    profile.update({field: rng.uniform(0, scale) for field, scale in INTERACTION_FEATURES.items()})
+    return profile
+
+
+def invert_update(recommender, item, reward, profile):
+    """Baseline: rebuild the design matrix and invert it on every update"""
+    row = recommender.model_row[recommender.item_index[item]]
+    x = context_vector(profile)
+    a = np.linalg.inv(recommender.a_inv[row]) + np.outer(x, x)
+    recommender.a_inv[row] = np.linalg.inv(a)
+    recommender.b[row] += reward * x
+    recommender.theta[row] = recommender.a_inv[row] @ recommender.b[row]
+
+
+def time_us(fn, calls):
+    start = time.perf_counter()
+    for args in calls:
+        fn(*args)
+    return (time.perf_counter() - start) / len(calls) * 1e6
+
+
+def main(updates=2000):
+    rng = np.random.default_rng(0)
+    profiles = [random_profile(rng) for _ in range(256)]
+    print(f"{updates} updates / recommendations per catalog size (us per call)")
+    print(f"{'items':>6} {'with feedback':>14} {'update (S-M)':>14} {'update (inv)':>14} {'recommend':>12}")
+    for arms in ARM_COUNTS:
+        items = [f"site{i}" for i in range(arms)]
+        recommender = LinUCBRecommender(items)
+        calls = [
+            (items[rng.integers(arms)], float(rng.random() < 0.3), profiles[i % len(profiles)])
+            for i in range(updates)
+        ]
+        sherman_morrison_us = time_us(recommender.update_reward, calls)
+        invert_us = time_us(lambda *args: invert_update(recommender, *args), calls)
+        recommend_us = time_us(recommender.get_recommendation, [(profile,) for profile in profiles])
+        print(f"{arms:>6} {recommender.model_count:>14} {sherman_morrison_us:>14.1f} "
+              f"{invert_us:>14.1f} {recommend_us:>12.1f}")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:2]))
@@ -0,0 +1,46 @@
+# login_throughput.py - Logins/sec and latency per password-hashing cost setting
+# Run from the code/ directory: python -m benchmarks.login_throughput [logins] [concurrency]
+import sys
+import time
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from modules.password_hasher import HASH_WORKERS, Pbkdf2Hasher, ScryptHasher, verify_password
+
+COST_SETTINGS = [
+    ("pbkdf2_sha256 iterations=100k", Pbkdf2Hasher(iterations=100_000)),
+    ("pbkdf2_sha256 iterations=300k", Pbkdf2Hasher(iterations=300_000)),
+    ("pbkdf2_sha256 iterations=600k", Pbkdf2Hasher(iterations=600_000)),
+    ("scrypt n=2^13", ScryptHasher(n=2 ** 13)),
+    ("scrypt n=2^14", ScryptHasher(n=2 ** 14)),
+    ("scrypt n=2^15", ScryptHasher(n=2 ** 15)),
+]
+
+
+def run_logins(hasher, n_logins, concurrency):
+    """Simulate concurrent sessions each verifying one login on the shared hashing pool"""
+    encoded = hasher.encode("correct horse battery staple")
+
+    def login(_):
+        start = time.perf_counter()
+        valid, _ = verify_password("correct horse battery staple", encoded, hasher=hasher)
+        assert valid
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as sessions:
+        latencies = np.array(list(sessions.map(login, range(n_logins))))
+    elapsed = time.perf_counter() - start
+    return n_logins / elapsed, np.percentile(latencies, 50) * 1000, np.percentile(latencies, 99) * 1000
+
+
+def main(n_logins=64, concurrency=16):
+    print(f"{n_logins} logins from {concurrency} concurrent sessions, {HASH_WORKERS} hashing workers")
+    print(f"{'setting':<32} {'logins/sec':>10} {'p50 ms':>9} {'p99 ms':>9}")
+    for label, hasher in COST_SETTINGS:
+        throughput, p50, p99 = run_logins(hasher, n_logins, concurrency)
+        print(f"{label:<32} {throughput:>10.1f} {p50:>9.1f} {p99:>9.1f}")
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:3]]
+    main(*args)
@@ -0,0 +1,92 @@
+# nonstationary_bandit.py - Regret of UCB versus discounted UCB when content quality drifts, and update/read cost
+# Run from the code/ directory: python -m benchmarks.nonstationary_bandit [items] [steps]
+import sys
+import time
+import numpy as np
+from modules.recommender import MIN_DISCOUNTED_ATTEMPTS, DiscountedUCBRecommender, MultiArmedBanditRecommender
+
+ARM_COUNTS = [100, 6000, 100_000, 1_000_000]
+UPDATES = 2000
+READS = 50
+
+
+def drifting_means(rng, catalog_size, steps, phases=4):
+    """Item quality that is reshuffled at the start of each phase (e.g. content updates, exam weeks)"""
+    means = rng.beta(2, 5, (phases, catalog_size))
+    return means[np.minimum(np.arange(steps) * phases // steps, phases - 1)]
+
+
+def replay(recommender, means, draws):
+    """Cumulative regret against the best item at each step"""
+    items = recommender.content_items
+    regret = 0.0
+    for step, draw in enumerate(draws):
+        index = recommender.item_index[recommender.get_recommendation()]
+        recommender.update_reward(items[index], float(draw < means[step, index]))
+        regret += means[step].max() - means[step, index]
+    return regret
+
+
+def eager_update(recommender, item, reward):
+    """Baseline: decay every arm on every event"""
+    index = recommender.item_index[item]
+    recommender.reward_sums *= recommender.discount
+    recommender.attempt_counts *= recommender.discount
+    recommender.reward_sums[index] += reward
+    recommender.attempt_counts[index] += 1
+
+
+def eager_scores(recommender):
+    """Baseline read: the arrays are already decayed, so score them as they are"""
+    attempt_counts = np.maximum(recommender.attempt_counts, MIN_DISCOUNTED_ATTEMPTS)
+    return recommender.reward_sums / attempt_counts + recommender.exploration_param * np.sqrt(
+        2 * np.log(recommender.discounted_total) / attempt_counts
+    )
+
+
+def update_us(update, items, rng):
+    calls = [(items[i], float(rng.random() < 0.3)) for i in rng.integers(0, len(items), UPDATES)]
+    start = time.perf_counter()
+    for item, reward in calls:
+        update(item, reward)
+    return (time.perf_counter() - start) / UPDATES * 1e6
+
+
+def read_us(read):
+    start = time.perf_counter()
+    for _ in range(READS):
+        read()
+    return (time.perf_counter() - start) / READS * 1e6
+
+
+def main(catalog_size=50, steps=40000):
+    rng = np.random.default_rng(0)
+    items = [f"site{i}" for i in range(catalog_size)]
+    means = drifting_means(rng, catalog_size, steps)
+    draws = rng.random(steps)
+    print(f"{catalog_size} items, {steps} steps, item quality reshuffled 3 times")
+    for name, recommender in [
+        ("UCB (lifetime averages)", MultiArmedBanditRecommender(items, 0.2)),
+        ("Discounted UCB 0.999", DiscountedUCBRecommender(items, 0.2, discount=0.999)),
+        ("Discounted UCB 0.99", DiscountedUCBRecommender(items, 0.2, discount=0.99)),
+    ]:
+        np.random.seed(1)  # untried items are picked with the global generator
+        print(f"{name:28} regret {replay(recommender, means, draws):10.1f}")
+
+    # Lazy decay makes an update O(1) instead of O(items); a read scores every
+    # arm either way, lazily with one extra pass to bring the sums up to date
+    print(f"\nCost in us: update_reward() ({UPDATES} events) and scoring every item ({READS} reads)")
+    print(f"{'items':>9} {'lazy update':>12} {'eager update':>13} {'lazy read':>11} {'eager read':>11}")
+    for arms in ARM_COUNTS:
+        arm_items = [f"site{i}" for i in range(arms)]
+        lazy = DiscountedUCBRecommender(arm_items)
+        eager = DiscountedUCBRecommender(arm_items)
+        lazy_update = update_us(lazy.update_reward, arm_items, rng)
+        eager_update_cost = update_us(lambda *args: eager_update(eager, *args), arm_items, rng)
+        eager.discounted_total = lazy.discounted_total
+        print(f"{arms:>9,} {lazy_update:>12.2f} {eager_update_cost:>13.2f} "
+              f"{read_us(lazy.ucb_scores):>11.1f} {read_us(lambda: eager_scores(eager)):>11.1f}")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:3]))
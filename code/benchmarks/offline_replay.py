@@ -0,0 +1,99 @@
+# offline_replay.py - Offline replay of each recommender over studentVle logs (real OULAD data if present)
+# Run from the code/ directory: python -m benchmarks.offline_replay [synthetic rows] [chunk rows]
+import os
+import sys
+import shutil
+import tracemalloc
+import tempfile
+import numpy as np
+import pandas as pd
+from modules.offline_eval import OULAD_DIR, load_presentation_sites, replay_evaluate
+from modules.recommender import (
+    DiscountedUCBRecommender,
+    MultiArmedBanditRecommender,
+    ShardedBanditRecommender,
+    ThompsonSamplingRecommender,
+)
+
+PRESENTATION = ("AAA", "2013J")
+SITES_PER_PRESENTATION = 300
+
+
+class RandomPolicy:
+    """Baseline: a uniformly random pick, which matches the logging policy's average reward"""
+
+    def __init__(self, content_items):
+        self.content_items = content_items
+        self.item_index = {item: i for i, item in enumerate(content_items)}
+        self.rng = np.random.default_rng(1)
+
+    def get_recommendation(self, student_profile=None):
+        return self.content_items[self.rng.integers(len(self.content_items))]
+
+    def update_reward(self, item, reward):
+        pass
+
+
+def write_synthetic_log(directory, rows, rng):
+    """
+    studentVle.csv / vle.csv lookalikes: 22 presentations whose materials are
+    logged uniformly at random (what rejection sampling assumes), each with
+    its own engagement rate
+    """
+    presentations = [(module * 3, year) for module in "ABCDEFG" for year in ("2013J", "2014J", "2014B")][:22]
+    sites = np.arange(len(presentations) * SITES_PER_PRESENTATION) + 500000
+    pd.DataFrame({
+        "id_site": sites,
+        "code_module": [p[0] for p in presentations for _ in range(SITES_PER_PRESENTATION)],
+        "code_presentation": [p[1] for p in presentations for _ in range(SITES_PER_PRESENTATION)],
+    }).to_csv(os.path.join(directory, "vle.csv"), index=False)
+    presentation = rng.integers(0, len(presentations), rows)
+    presentation.sort()
+    site = presentation * SITES_PER_PRESENTATION + rng.integers(0, SITES_PER_PRESENTATION, rows)
+    engagement = rng.beta(1, 3, len(sites))
+    pd.DataFrame({
+        "code_module": np.array([p[0] for p in presentations])[presentation],
+        "code_presentation": np.array([p[1] for p in presentations])[presentation],
+        "id_student": rng.integers(0, 30000, rows),
+        "id_site": sites[site],
+        "date": rng.integers(-10, 260, rows),
+        "sum_click": rng.geometric(1 - engagement[site]),
+    }).to_csv(os.path.join(directory, "studentVle.csv"), index=False)
+
+
+def main(rows=10_600_000, chunksize=500_000):
+    directory = OULAD_DIR
+    temp_dir = None
+    if not os.path.exists(os.path.join(directory, "studentVle.csv")):
+        temp_dir = directory = tempfile.mkdtemp(prefix="oulad_")
+        print(f"studentVle.csv not found in {OULAD_DIR}; writing a synthetic {rows:,}-row log")
+        write_synthetic_log(directory, rows, np.random.default_rng(0))
+    try:
+        items = load_presentation_sites(*PRESENTATION, path=os.path.join(directory, "vle.csv"))
+        path = os.path.join(directory, "studentVle.csv")
+        print(f"Replaying {'-'.join(PRESENTATION)} ({len(items)} materials), {chunksize:,}-row chunks")
+        print(f"{'recommender':28} {'events':>10} {'matched':>8} {'reward':>8} {'events/sec':>12}")
+        for n, (name, recommender) in enumerate([
+            ("Random (logging policy)", RandomPolicy(items)),
+            ("UCB", MultiArmedBanditRecommender(items)),
+            ("Thompson sampling", ThompsonSamplingRecommender(items, rng=np.random.default_rng(1))),
+            ("Discounted UCB", DiscountedUCBRecommender(items)),
+            ("Sharded bandit", ShardedBanditRecommender(items)),
+        ]):
+            np.random.seed(1)
+            if n == 0:
+                tracemalloc.start()
+            result = replay_evaluate(recommender, path, presentation=PRESENTATION, chunksize=chunksize)
+            if n == 0:
+                peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+            print(f"{name:28} {result['events']:>10,} {result['matched']:>8,} "
+                  f"{result['mean_reward']:>8.3f} {result['events_per_sec']:>12,.0f}")
+        print(f"Peak memory allocated while replaying: {peak / 1e6:.0f} MB")
+    finally:
+        if temp_dir:
+            shutil.rmtree(temp_dir)
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:3]))
@@ -0,0 +1,85 @@
+# reward_ingestion.py - Concurrent reward ingestion: queued micro-batches versus locked update_reward()
+# Run from the code/ directory: python -m benchmarks.reward_ingestion [events] [threads] [items]
+import sys
+import time
+import threading
+import numpy as np
+from modules.recommender import MultiArmedBanditRecommender
+from modules.reward_queue import RewardIngestionQueue
+
+
+def run_producers(submit, events, threads):
+    """Submit events from several threads; returns (elapsed seconds, per-call latencies in us)"""
+    chunks = np.array_split(np.arange(len(events[0])), threads)
+    latencies = [None] * threads
+
+    def produce(slot, rows):
+        items, rewards = events
+        timings = np.empty(len(rows))
+        for n, row in enumerate(rows):
+            start = time.perf_counter()
+            submit(items[row], rewards[row])
+            timings[n] = time.perf_counter() - start
+        latencies[slot] = timings
+
+    workers = [threading.Thread(target=produce, args=(slot, rows)) for slot, rows in enumerate(chunks)]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return time.perf_counter() - start, np.concatenate(latencies) * 1e6
+
+
+def main(event_count=400_000, threads=8, catalog_size=6000):
+    rng = np.random.default_rng(0)
+    items = [f"site{i}" for i in range(catalog_size)]
+    events = (
+        [items[i] for i in rng.integers(0, catalog_size, event_count)],
+        (rng.random(event_count) < 0.3).astype(float).tolist(),
+    )
+    print(f"{event_count:,} rewards from {threads} threads, {catalog_size} items")
+    print(f"{'':24} {'events/sec':>12} {'p50 us':>8} {'p99 us':>8}")
+
+    locked = MultiArmedBanditRecommender(items)
+    lock = threading.Lock()
+
+    def locked_update(item, reward):
+        with lock:
+            locked.update_reward(item, reward)
+
+    elapsed, latencies = run_producers(locked_update, events, threads)
+    print(f"{'locked update_reward':24} {event_count / elapsed:>12,.0f} "
+          f"{np.percentile(latencies, 50):>8.1f} {np.percentile(latencies, 99):>8.1f}")
+
+    queued = MultiArmedBanditRecommender(items)
+    queue = RewardIngestionQueue(queued)
+    start = time.perf_counter()
+    _, latencies = run_producers(queue.submit, events, threads)
+    queue.flush()
+    elapsed = time.perf_counter() - start
+    queue.stop()
+    print(f"{'queue (submit + apply)':24} {event_count / elapsed:>12,.0f} "
+          f"{np.percentile(latencies, 50):>8.1f} {np.percentile(latencies, 99):>8.1f}")
+    assert np.array_equal(queued.attempt_counts, locked.attempt_counts)
+    assert np.allclose(queued.reward_sums, locked.reward_sums)
+
+    stats = queue.stats()
+    print(f"{stats['batches']} batches, peak depth {stats['peak_depth']:,}, "
+          f"apply p50 {stats['apply_ms_p50']:.2f} ms / p95 {stats['apply_ms_p95']:.2f} ms, "
+          f"event wait p95 {stats['event_ms_p95']:.1f} ms")
+
+    # Back-pressure: a tiny queue whose applier is slowed down drops what it cannot hold
+    slow = MultiArmedBanditRecommender(items)
+    apply_rewards = slow.apply_rewards
+    slow.apply_rewards = lambda indices, rewards: (time.sleep(0.01), apply_rewards(indices, rewards))
+    queue = RewardIngestionQueue(slow, max_depth=2048)
+    run_producers(queue.submit, events, threads)
+    queue.stop()
+    stats = queue.stats()
+    assert stats["applied"] + stats["dropped"] == event_count
+    print(f"Back-pressure (depth 2048, slow applier): {stats['applied']:,} applied, {stats['dropped']:,} dropped")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:4]))
@@ -0,0 +1,75 @@
+# schema_migration.py - Read-path cost before and after the one-time schema migration
+# Run from the code/ directory: python -m benchmarks.schema_migration [n_users]
+import os
+import sys
+import time
+import tempfile
+import pandas as pd
+import modules.preference_store as preference_store
+from modules.migrations import run_migrations
+from modules.user_store import CsvUserStore
+
+REPEATS = 20
+
+
+def make_legacy_csv(path, n_users):
+    """Write a pre-migration users file (learning_style, no pace/format columns)"""
+    pd.DataFrame(
+        {
+            "username": [f"student{i}" for i in range(n_users)],
+            "password": ["0" * 64] * n_users,
+            "role": ["student"] * n_users,
+            "email": [f"student{i}@example.com" for i in range(n_users)],
+            "last_login": [None] * n_users,
+            "learning_style": ["Visual/Interactive"] * n_users,
+        }
+    ).to_csv(path, index=False)
+
+
+def legacy_read(path):
+    """The previous load_users() read path, which backfilled columns on every call"""
+    users = pd.read_csv(path)
+    if "learning_preference" not in users.columns:
+        if "learning_style" in users.columns:
+            users["learning_preference"] = users["learning_style"]
+            users = users.drop(columns=["learning_style"])
+        else:
+            users["learning_preference"] = None
+    if "preferred_pace" not in users.columns:
+        users["preferred_pace"] = None
+    if "content_format" not in users.columns:
+        users["content_format"] = None
+    return users
+
+
+def time_reads(read):
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        read()
+    return (time.perf_counter() - start) / REPEATS * 1000
+
+
+def main(n_users=50000):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "users.csv")
+        make_legacy_csv(path, n_users)
+        store = CsvUserStore(path)
+        # Keep migrated preferences out of the real data directory
+        preference_store._store = preference_store.CsvPreferenceStore(os.path.join(tmp, "preferences.csv"))
+
+        legacy_ms = time_reads(lambda: legacy_read(path))
+        steps = run_migrations(store)
+        migrated_ms = time_reads(store.load_all)
+        rerun = run_migrations(store)
+
+    print(f"Users: {n_users}")
+    for step in steps:
+        print(f"  migration v{step['version']}: {step['description']:<48} {step['seconds'] * 1000:8.1f} ms")
+    print(f"  second run applied {len(rerun)} steps")
+    print(f"Read path (legacy, per-call backfill): {legacy_ms:8.1f} ms/read")
+    print(f"Read path (migrated, no schema work):  {migrated_ms:8.1f} ms/read")
+    print(f"Saving per read: {legacy_ms - migrated_ms:.1f} ms ({1 - migrated_ms / legacy_ms:.0%})")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50000)
@@ -0,0 +1,105 @@
+# sharded_bandit.py - Segment-sharded bandit versus one global bandit and per-segment bandit objects
+# Run from the code/ directory: python -m benchmarks.sharded_bandit [items] [steps]
+import sys
+import time
+import tracemalloc
+import numpy as np
+from modules.preference_store import PREFERENCE_OPTIONS
+from modules.recommender import MultiArmedBanditRecommender, ShardedBanditRecommender
+
+# OULAD's 22 module presentations
+COURSES = [f"{module * 3}-{presentation}" for module in "ABCDEFG" for presentation in ("2013B", "2013J", "2014B", "2014J")][:22]
+SEGMENTS = PREFERENCE_OPTIONS["learning_preference"]
+MEMORY_ITEMS = 6000
+
+
+class PerSegmentBandits:
+    """Baseline: a separate MultiArmedBanditRecommender object per segment, no fallback"""
+
+    def __init__(self, content_items):
+        self.content_items = content_items
+        self.bandits = {}
+
+    def _bandit(self, profile):
+        key = (profile["course"], profile["learning_preference"])
+        if key not in self.bandits:
+            self.bandits[key] = MultiArmedBanditRecommender(self.content_items)
+        return self.bandits[key]
+
+    def get_recommendation(self, student_profile=None):
+        return self._bandit(student_profile).get_recommendation()
+
+    def update_reward(self, item, reward, student_profile=None):
+        self._bandit(student_profile).update_reward(item, reward)
+
+
+class GlobalBandit(MultiArmedBanditRecommender):
+    def update_reward(self, item, reward, student_profile=None):
+        super().update_reward(item, reward)
+
+
+def replay(recommender, profiles, segment_of, means, draws):
+    """Cumulative regret when each segment has its own best items"""
+    items = recommender.content_items
+    index_of = {item: i for i, item in enumerate(items)}
+    regret = 0.0
+    for profile, draw in zip(profiles, draws):
+        segment = segment_of[(profile["course"], profile["learning_preference"])]
+        index = index_of[recommender.get_recommendation(profile)]
+        recommender.update_reward(items[index], float(draw < means[segment, index]), profile)
+        regret += means[segment].max() - means[segment, index]
+    return regret
+
+
+def fill_all_shards(factory, items, rng):
+    """Build a recommender with every (course, segment) shard holding some feedback"""
+    recommender = factory(items)
+    for course in COURSES:
+        for segment in SEGMENTS:
+            profile = {"course": course, "learning_preference": segment}
+            for index in rng.integers(0, len(items), 20):
+                recommender.update_reward(items[index], 1.0, profile)
+    return recommender
+
+
+def main(catalog_size=100, steps=100000):
+    rng = np.random.default_rng(0)
+    items = [f"site{i}" for i in range(catalog_size)]
+    keys = [(course, segment) for course in COURSES for segment in SEGMENTS]
+    segment_of = {key: n for n, key in enumerate(keys)}
+    # Shared item quality plus a segment-specific preference
+    means = np.clip(rng.beta(2, 5, catalog_size) + rng.normal(0, 0.15, (len(keys), catalog_size)), 0, 1)
+    # Popular segments see most of the traffic, so many shards stay cold
+    weights = 1 / np.arange(1, len(keys) + 1)
+    picks = rng.choice(len(keys), steps, p=weights / weights.sum())
+    profiles = [{"course": keys[n][0], "learning_preference": keys[n][1]} for n in picks]
+    draws = rng.random(steps)
+
+    print(f"{catalog_size} items, {len(keys)} segments, {steps} steps (Zipf segment traffic)")
+    print(f"{'recommender':34} {'regret':>10} {'us/step':>9}")
+    for name, recommender in [
+        ("Global bandit", GlobalBandit(items)),
+        ("Per-segment bandits (objects)", PerSegmentBandits(items)),
+        ("Sharded bandit (global fallback)", ShardedBanditRecommender(items)),
+    ]:
+        np.random.seed(1)
+        start = time.perf_counter()
+        regret = replay(recommender, profiles, segment_of, means, draws)
+        print(f"{name:34} {regret:10.1f} {(time.perf_counter() - start) / steps * 1e6:9.1f}")
+
+    items = [f"site{i}" for i in range(MEMORY_ITEMS)]
+    print(f"\nMemory with all {len(keys)} shards live, {MEMORY_ITEMS} items")
+    for name, factory in [
+        ("Per-segment bandits (objects)", PerSegmentBandits),
+        ("Sharded bandit (2-D arrays)", ShardedBanditRecommender),
+    ]:
+        tracemalloc.start()
+        recommender = fill_all_shards(factory, items, rng)
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"{name:34} {current / 1e6:8.1f} MB")
+        del recommender
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:3]))
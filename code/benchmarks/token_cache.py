@@ -0,0 +1,30 @@
+# token_cache.py - Per-rerun token verification cost with and without the verified-token cache
+# Run from the code/ directory: python -m benchmarks.token_cache [reruns]
+import sys
+import time
+from modules.jwt_auth import _decode_token, generate_token, invalidate_cached_token, verify_token
+
+
+def time_per_call(fn, token, reruns):
+    start = time.perf_counter()
+    for _ in range(reruns):
+        valid, _ = fn(token)
+        assert valid
+    return (time.perf_counter() - start) / reruns * 1e6
+
+
+def main(reruns=100000):
+    token = generate_token("student1", "student")
+    invalidate_cached_token()
+
+    uncached_us = time_per_call(_decode_token, token, reruns)
+    cached_us = time_per_call(verify_token, token, reruns)
+
+    print(f"{reruns} reruns verifying one session token")
+    print(f"Without cache (HS256 decode every rerun): {uncached_us:8.2f} us/rerun")
+    print(f"With cache (digest lookup):               {cached_us:8.2f} us/rerun")
+    print(f"Speedup: {uncached_us / cached_us:.1f}x")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
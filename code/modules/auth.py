@@ -1,140 +1,149 @@
 # auth.py
+import secrets
+import functools
 import streamlit as st
-import pandas as pd
-import hashlib
-import os
-from datetime import datetime, timedelta
+from datetime import datetime
+from modules.user_store import get_user_store
+from modules.user_cache import get_user_cache
+from modules.login_log import get_login_log
+from modules.preference_store import PREFERENCE_FIELDS, get_preference_store
+from modules.password_hasher import hash_password, verify_password
+from modules.rate_limiter import get_login_limiter
+from modules.jwt_auth import revoke_user_tokens
 
-# Get the data directory path relative to this module
-DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data")
-USERS_CSV = os.path.join(DATA_DIR, "users.csv")
 
+# Second value authenticate() returns when the rate limiter rejected the attempt
+LOGIN_THROTTLED = "throttled"
 
-# Set up database connection (using CSV for simplicity, use SQL in production)
-def load_users():
-    if not os.path.exists(USERS_CSV):
-        # Create default admin user if file doesn't exist
-        users = pd.DataFrame(
-            {
-                "username": ["admin"],
-                "password": [hashlib.sha256("admin123".encode()).hexdigest()],
-                "role": ["admin"],
-                "email": ["admin@example.com"],
-                "last_login": [None],
-                "learning_preference": [None],
-                "preferred_pace": [None],
-                "content_format": [None],
-            }
-        )
-        os.makedirs(DATA_DIR, exist_ok=True)
-        users.to_csv(USERS_CSV, index=False)
-    else:
-        users = pd.read_csv(USERS_CSV)
-        # Add learning preference columns if they don't exist (for backward compatibility)
-        if "learning_preference" not in users.columns:
-            if "learning_style" in users.columns:
-                users["learning_preference"] = users["learning_style"]
-                users = users.drop(columns=["learning_style"])
-            else:
-                users["learning_preference"] = None
-        if "preferred_pace" not in users.columns:
-            users["preferred_pace"] = None
-        if "content_format" not in users.columns:
-            users["content_format"] = None
-    return users
 
+@functools.lru_cache(maxsize=1)
+def _dummy_password_hash():
+    """Hash checked for unknown usernames, so they cost as much as known ones"""
+    return hash_password(secrets.token_urlsafe(16))
 
-def save_users(users_df):
-    users_df.to_csv(USERS_CSV, index=False)
 
+# User storage is delegated to the configured UserStore backend (SQLite by default)
+def load_users():
+    # Shared process-wide snapshot; copy before modifying
+    return get_user_cache().get().users
 
-def authenticate(username, password):
-    users = load_users()
-    hashed_password = hashlib.sha256(password.encode()).hexdigest()
 
-    user_row = users[users["username"] == username]
-    if not user_row.empty and user_row.iloc[0]["password"] == hashed_password:
-        # Update last login
-        users.loc[users["username"] == username, "last_login"] = (
-            datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        )
-        save_users(users)
-        return True, user_row.iloc[0]["role"]
+def save_users(users_df):
+    get_user_store().replace_all(users_df)
+    get_user_cache().invalidate()
+
+
+def authenticate(username, password, client_id=None):
+    # Reject excess attempts before touching the store or hashing anything
+    if not get_login_limiter().allow(username, client_id):
+        return False, LOGIN_THROTTLED
+
+    store = get_user_store()
+
+    user = store.get_user(username)
+    if user is None:
+        # Do the same key-derivation work as for a real user, so response time
+        # does not reveal which usernames exist
+        verify_password(password, _dummy_password_hash())
+        return False, None
+    try:
+        valid, new_hash = verify_password(password, user["password"])
+    except ValueError:
+        # Stored hash uses an unknown algorithm
+        return False, None
+    if valid:
+        if new_hash is not None:
+            # Transparently upgrade legacy SHA-256 or outdated-cost hashes
+            store.update_user(username, password=new_hash)
+            get_user_cache().invalidate()
+        # Record last login in the append-only log instead of rewriting the user table
+        get_login_log().record(username, last_login=datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+        return True, user["role"]
     return False, None
 
 
 def create_user(username, password, role, email):
-    users = load_users()
-
-    # Check if username exists
-    if username in users["username"].values:
-        return False, "Username already exists"
+    store = get_user_store()
 
     # Add new user
-    hashed_password = hashlib.sha256(password.encode()).hexdigest()
-    new_user = pd.DataFrame(
-        {
-            "username": [username],
-            "password": [hashed_password],
-            "role": [role],
-            "email": [email],
-            "last_login": [None],
-            "learning_preference": [None],
-            "preferred_pace": [None],
-            "content_format": [None],
-        }
-    )
-
-    users = pd.concat([users, new_user], ignore_index=True)
-    save_users(users)
+    hashed_password = hash_password(password)
+    new_user = {
+        "username": username,
+        "password": hashed_password,
+        "role": role,
+        "email": email,
+        "last_login": None,
+    }
+
+    # The store rejects the insert if the username exists
+    if not store.add_user(new_user):
+        return False, "Username already exists"
+    get_user_cache().invalidate()
     return True, "User created successfully"
 
 
 def change_password(username, current_password, new_password):
-    users = load_users()
-    hashed_current = hashlib.sha256(current_password.encode()).hexdigest()
-
-    user_row = users[users["username"] == username]
-    if not user_row.empty and user_row.iloc[0]["password"] == hashed_current:
-        hashed_new = hashlib.sha256(new_password.encode()).hexdigest()
-        users.loc[users["username"] == username, "password"] = hashed_new
-        save_users(users)
+    store = get_user_store()
+
+    user = store.get_user(username)
+    if user is None:
+        return False, "Current password is incorrect"
+    try:
+        valid = verify_password(current_password, user["password"])[0]
+    except ValueError:
+        # Stored hash uses an unknown algorithm
+        valid = False
+    if valid:
+        hashed_new = hash_password(new_password)
+        store.update_user(username, password=hashed_new)
+        get_user_cache().invalidate()
+        # Sessions opened with the old password must not outlive it
+        revoke_user_tokens(username)
         return True, "Password changed successfully"
     return False, "Current password is incorrect"
 
 
+def revoke_user_sessions(username):
+    """Sign a user out everywhere (admin action; also for account removal)"""
+    if not get_user_store().user_exists(username):
+        return False, "User not found"
+    revoke_user_tokens(username)
+    return True, f"All sessions for {username} have been revoked"
+
+
 def is_authenticated():
     return "logged_in" in st.session_state and st.session_state.logged_in
 
 
 def get_user_preferences(username):
     """Get learning preferences for a specific user"""
-    users = load_users()
-    user_row = users[users["username"] == username]
-
-    if not user_row.empty:
-        return {
-            "learning_preference": user_row.iloc[0].get("learning_preference"),
-            "preferred_pace": user_row.iloc[0].get("preferred_pace"),
-            "content_format": user_row.iloc[0].get("content_format"),
-        }
+    prefs = get_preference_store().get(username)
+    if prefs is not None:
+        return prefs
+    if get_user_store().user_exists(username):
+        return {field: None for field in PREFERENCE_FIELDS}
     return None
 
 
+def get_preferences_for_users(usernames):
+    """Get learning preferences for many users in one read (users without any are omitted)"""
+    return get_preference_store().get_many(usernames)
+
+
 def update_user_preferences(username, learning_preference=None, preferred_pace=None, content_format=None):
     """Update learning preferences for a specific user"""
-    users = load_users()
-
-    if username not in users["username"].values:
+    if not get_user_store().user_exists(username):
         return False, "User not found"
 
     # Update only the provided fields
+    fields = {}
     if learning_preference is not None:
-        users.loc[users["username"] == username, "learning_preference"] = learning_preference
+        fields["learning_preference"] = learning_preference
     if preferred_pace is not None:
-        users.loc[users["username"] == username, "preferred_pace"] = preferred_pace
+        fields["preferred_pace"] = preferred_pace
     if content_format is not None:
-        users.loc[users["username"] == username, "content_format"] = content_format
+        fields["content_format"] = content_format
 
-    save_users(users)
+    # Partial upsert in the preference store; credentials are never rewritten
+    get_preference_store().upsert(username, **fields)
     return True, "Learning preferences updated successfully"
@@ -0,0 +1,270 @@
+# bandit_store.py
+import os
+import re
+import json
+import time
+import atexit
+import threading
+import numpy as np
+from modules.user_store import DATA_DIR
+
+BANDIT_STATE_DIR = os.path.join(DATA_DIR, "bandit")
+
+# One fixed-size record per update_reward() call
+LOG_DTYPE = np.dtype([("item", "<i4"), ("reward", "<f4")])
+# Per-item totals in a snapshot, in catalog order
+SNAPSHOT_DTYPE = np.dtype([("reward_sum", "<f8"), ("attempts", "<i8")])
+
+FLUSH_BATCH_SIZE = 1024  # events buffered before they are appended to the log
+FLUSH_INTERVAL = 2.0  # seconds an event may sit in the buffer
+SNAPSHOT_EVERY = 1_000_000  # logged events between snapshots
+
+_FILE_PATTERN = re.compile(r"^(\d+)\.(log|snapshot\.npy)$")
+
+
+class BanditStateStore:
+    """
+    Durable bandit statistics: snapshots plus an append-only reward log
+
+    Rewards are appended to a binary log of fixed-size (item, reward)
+    records. Every SNAPSHOT_EVERY events the log is rotated and per-item
+    totals are written to a memory-mappable .npy snapshot. Generation N's
+    snapshot holds everything logged before log N, so recovery loads the
+    newest snapshot and replays the logs from its generation on; a crash
+    at any point leaves either the old or the new snapshot plus every log
+    written since. Item positions come from an append-only catalog file,
+    so adding content never invalidates the log. Appends are fsynced, and
+    a background flusher (start_flusher) bounds how long a buffered reward
+    can wait to FLUSH_INTERVAL.
+    """
+
+    def __init__(self, directory=BANDIT_STATE_DIR, snapshot_every=SNAPSHOT_EVERY):
+        self.directory = directory
+        self.snapshot_every = snapshot_every
+        self._lock = threading.Lock()
+        self._buffer = np.zeros(FLUSH_BATCH_SIZE, dtype=LOG_DTYPE)
+        self._buffered = 0
+        self._last_flush = time.monotonic()
+        self._logged_since_snapshot = 0
+        self._stop = threading.Event()
+        self._flusher = None
+        self.recovery = None
+        os.makedirs(directory, exist_ok=True)
+
+        self.items = []
+        self.item_index = {}
+        catalog_path = os.path.join(directory, "items.jsonl")
+        if os.path.exists(catalog_path):
+            self._load_catalog(catalog_path)
+        self._catalog = open(catalog_path, "a")
+        self.reward_sums = np.zeros(len(self.items))
+        self.attempt_counts = np.zeros(len(self.items), dtype=np.int64)
+        self._recover()
+
+    def _path(self, generation, kind):
+        return os.path.join(self.directory, f"{generation:08d}.{kind}")
+
+    def _generations(self, kind):
+        found = []
+        for name in os.listdir(self.directory):
+            match = _FILE_PATTERN.match(name)
+            if match and match.group(2) == kind:
+                found.append(int(match.group(1)))
+        return sorted(found)
+
+    def _load_catalog(self, path):
+        """Index the catalog's items, dropping a last line torn by a crash mid-append"""
+        with open(path, "rb") as f:
+            data = f.read()
+        complete = data[:data.rfind(b"\n") + 1]
+        if len(complete) < len(data):
+            # The torn item was never acknowledged (register_items syncs before
+            # returning positions), so no logged reward refers to it
+            with open(path, "r+b") as f:
+                f.truncate(len(complete))
+        for line in complete.splitlines():
+            self._index_item(json.loads(line))
+
+    def _index_item(self, item):
+        self.item_index[item] = len(self.items)
+        self.items.append(item)
+
+    def _grow(self, size):
+        if size > len(self.reward_sums):
+            self.reward_sums = np.concatenate([self.reward_sums, np.zeros(size - len(self.reward_sums))])
+            self.attempt_counts = np.concatenate(
+                [self.attempt_counts, np.zeros(size - len(self.attempt_counts), dtype=np.int64)]
+            )
+
+    def _apply(self, records):
+        """Fold log records into the totals with one vectorized pass"""
+        if len(records):
+            size = len(self.reward_sums)
+            self.reward_sums += np.bincount(records["item"], weights=records["reward"], minlength=size)[:size]
+            self.attempt_counts += np.bincount(records["item"], minlength=size)[:size]
+
+    def _recover(self):
+        """Load the newest snapshot and replay the logs written since"""
+        start = time.perf_counter()
+        snapshots = self._generations("snapshot.npy")
+        self.generation = snapshots[-1] if snapshots else 0
+        if snapshots:
+            snapshot = np.load(self._path(self.generation, "snapshot.npy"), mmap_mode="r")
+            self._grow(len(snapshot))
+            self.reward_sums[:len(snapshot)] = snapshot["reward_sum"]
+            self.attempt_counts[:len(snapshot)] = snapshot["attempts"]
+        replayed = 0
+        for generation in self._generations("log"):
+            if generation < self.generation:
+                continue
+            path = self._path(generation, "log")
+            # Drop a record torn by a crash mid-append
+            size = os.path.getsize(path)
+            if size % LOG_DTYPE.itemsize:
+                with open(path, "r+b") as f:
+                    f.truncate(size - size % LOG_DTYPE.itemsize)
+            records = np.fromfile(path, dtype=LOG_DTYPE)
+            self._apply(records)
+            replayed += len(records)
+            self.generation = generation
+        self._logged_since_snapshot = replayed
+        self._log = open(self._path(self.generation, "log"), "ab")
+        self.recovery = {"replayed_events": replayed, "seconds": time.perf_counter() - start}
+
+    def register_items(self, items):
+        """Add unseen items to the catalog; returns their catalog positions"""
+        # NumPy scalars (e.g. id_site values from pandas) are stored as plain Python values
+        items = [item.item() if isinstance(item, np.generic) else item for item in items]
+        with self._lock:
+            new_items = [item for item in items if item not in self.item_index]
+            for item in new_items:
+                self._index_item(item)
+                self._catalog.write(json.dumps(item) + "\n")
+            if new_items:
+                self._catalog.flush()
+                os.fsync(self._catalog.fileno())
+                self._grow(len(self.items))
+            return np.array([self.item_index[item] for item in items], dtype=np.int64)
+
+    def record(self, item, reward):
+        """Log one reward, flushing if the batch is full or stale"""
+        with self._lock:
+            index = self.item_index[item]
+            self.reward_sums[index] += reward
+            self.attempt_counts[index] += 1
+            self._buffer[self._buffered] = (index, reward)
+            self._buffered += 1
+            if self._buffered == FLUSH_BATCH_SIZE or time.monotonic() - self._last_flush >= FLUSH_INTERVAL:
+                self._flush_locked()
+
+    def record_many(self, indices, rewards):
+        """Log a batch of rewards given as catalog positions"""
+        records = np.empty(len(indices), dtype=LOG_DTYPE)
+        records["item"] = indices
+        records["reward"] = rewards
+        with self._lock:
+            self._flush_locked()
+            self._apply(records)
+            records.tofile(self._log)
+            self._sync_log()
+            self._after_append(len(records))
+
+    def flush(self):
+        with self._lock:
+            self._flush_locked()
+
+    def _sync_log(self):
+        self._log.flush()
+        os.fsync(self._log.fileno())
+
+    def _flush_locked(self):
+        if self._buffered:
+            self._buffer[:self._buffered].tofile(self._log)
+            self._sync_log()
+            count = self._buffered
+            self._buffered = 0
+            self._after_append(count)
+        self._last_flush = time.monotonic()
+
+    def _after_append(self, count):
+        self._logged_since_snapshot += count
+        if self._logged_since_snapshot >= self.snapshot_every:
+            self._snapshot_locked()
+
+    def snapshot(self):
+        """Write a snapshot now and start a new log generation"""
+        with self._lock:
+            self._flush_locked()
+            self._snapshot_locked()
+
+    def _snapshot_locked(self):
+        generation = self.generation + 1
+        # New events go to the next log before the snapshot covering the old one exists
+        self._log.close()
+        self._log = open(self._path(generation, "log"), "ab")
+        tmp_path = self._path(generation, "snapshot.npy") + ".tmp"
+        snapshot = np.lib.format.open_memmap(tmp_path, mode="w+", dtype=SNAPSHOT_DTYPE, shape=(len(self.items),))
+        snapshot["reward_sum"] = self.reward_sums[:len(self.items)]
+        snapshot["attempts"] = self.attempt_counts[:len(self.items)]
+        snapshot.flush()
+        del snapshot
+        os.replace(tmp_path, self._path(generation, "snapshot.npy"))
+        # Older generations are now covered by the snapshot
+        for kind in ("log", "snapshot.npy"):
+            for old in self._generations(kind):
+                if old < generation:
+                    os.remove(self._path(old, kind))
+        self.generation = generation
+        self._logged_since_snapshot = 0
+
+    def load_into(self, recommender):
+        """Copy the durable totals into a recommender's arrays"""
+        positions = self.register_items(recommender.content_items)
+        # Recommender index -> catalog position, for batched record_many() calls
+        recommender.store_positions = positions
+        with self._lock:
+            recommender.reward_sums[:] = self.reward_sums[positions]
+            recommender.attempt_counts[:] = self.attempt_counts[positions]
+        recommender.untried = recommender.attempt_counts == 0
+        recommender.untried_count = int(recommender.untried.sum())
+        recommender.total_attempts = int(recommender.attempt_counts.sum())
+
+    def start_flusher(self, interval=FLUSH_INTERVAL):
+        """Start the background thread that flushes buffered rewards (once per store)"""
+        if self._flusher is not None:
+            return
+
+        def run():
+            while not self._stop.wait(interval):
+                self.flush()
+
+        self._flusher = threading.Thread(target=run, name="bandit-store-flusher", daemon=True)
+        self._flusher.start()
+
+    def stop(self):
+        """Stop the flusher and flush anything still buffered"""
+        self._stop.set()
+        self.flush()
+
+    def close(self):
+        self._stop.set()
+        with self._lock:
+            self._flush_locked()
+            self._log.close()
+            self._catalog.close()
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_bandit_store():
+    """Return the process-wide bandit state store, recovering it on first use"""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = BanditStateStore()
+                _store.start_flusher()
+                atexit.register(_store.stop)
+    return _store
@@ -0,0 +1,95 @@
+# bulk_import.py
+import os
+import time
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+from modules.password_hasher import hash_password
+from modules.user_store import get_user_store
+from modules.user_cache import get_user_cache
+
+REQUIRED_COLUMNS = ["username", "email", "role", "password"]
+IMPORTABLE_ROLES = ["student", "teacher"]
+USERNAME_PATTERN = r"[A-Za-z0-9_.-]{1,64}"
+EMAIL_PATTERN = r"[^@\s]+@[^@\s]+\.[^@\s]+"
+CHUNK_SIZE = 5000
+
+
+def _validate_chunk(chunk, seen):
+    """
+    Vectorized validation of one chunk
+
+    Returns a boolean mask of valid rows and a Series of error messages for
+    the invalid ones. Usernames are also checked against `seen` (existing
+    users plus rows already accepted from this file) and added to it.
+    """
+    usernames = chunk["username"].str.strip()
+    emails = chunk["email"].str.strip()
+    roles = chunk["role"].str.strip().str.lower()
+
+    errors = pd.Series("", index=chunk.index)
+    checks = [
+        (~usernames.str.fullmatch(USERNAME_PATTERN), "invalid username"),
+        (~emails.str.fullmatch(EMAIL_PATTERN), "invalid email"),
+        (~roles.isin(IMPORTABLE_ROLES), f"role must be one of {', '.join(IMPORTABLE_ROLES)}"),
+        (chunk["password"] == "", "missing password"),
+        (usernames.isin(seen), "username already exists"),
+        (usernames.duplicated(keep="first"), "duplicate username in file"),
+    ]
+    for failed, message in checks:
+        errors = errors.where(~failed, errors + "; " + message)
+    errors = errors.str.lstrip("; ")
+
+    valid = errors == ""
+    seen.update(usernames[valid])
+    return valid, errors, usernames, emails, roles
+
+
+def import_users_csv(file, chunk_size=CHUNK_SIZE, workers=None):
+    """
+    Stream a users CSV (username,email,role,password) into the user store
+
+    The file is parsed and validated chunk by chunk, passwords are hashed in
+    a worker pool, and all valid rows are committed in a single write.
+    Returns a report dict with the created count, per-row errors and
+    throughput.
+    """
+    start = time.perf_counter()
+    seen = set(get_user_cache().get().by_username)
+    records = []
+    errors = []
+    total_rows = 0
+    workers = workers or min(8, os.cpu_count() or 1)
+
+    reader = pd.read_csv(file, chunksize=chunk_size, dtype=str, keep_default_na=False)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for chunk in reader:
+            missing = [col for col in REQUIRED_COLUMNS if col not in chunk.columns]
+            if missing:
+                raise ValueError(f"Missing required columns: {', '.join(missing)}")
+            total_rows += len(chunk)
+
+            valid, row_errors, usernames, emails, roles = _validate_chunk(chunk, seen)
+            # Report 1-based line numbers in the uploaded file (header is line 1)
+            for idx in chunk.index[~valid]:
+                errors.append({"line": idx + 2, "username": chunk.at[idx, "username"], "error": row_errors.at[idx]})
+
+            hashes = pool.map(hash_password, chunk.loc[valid, "password"], chunksize=256)
+            for username, email, role, hashed in zip(usernames[valid], emails[valid], roles[valid], hashes):
+                records.append({"username": username, "password": hashed, "role": role, "email": email})
+
+    created = get_user_store().add_users(records) if records else 0
+    if created:
+        get_user_cache().invalidate()
+    # Rows that passed validation but lost a race with a concurrent insert
+    conflicts = len(records) - created
+    if conflicts:
+        errors.append({"line": None, "username": None, "error": f"{conflicts} usernames were taken during import"})
+
+    elapsed = time.perf_counter() - start
+    return {
+        "rows": total_rows,
+        "created": created,
+        "errors": errors,
+        "elapsed": elapsed,
+        "rows_per_sec": total_rows / elapsed if elapsed > 0 else 0.0,
+    }
@@ -0,0 +1,269 @@
+# collaborative_filtering.py
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from scipy import sparse
+
+ALS_FACTORS = 32
+ALS_REGULARIZATION = 0.1
+ALS_ALPHA = 10.0  # confidence added per log-click: c = 1 + alpha * log(1 + clicks)
+ALS_ITERATIONS = 10
+ALS_CG_STEPS = 3  # conjugate-gradient steps per row and iteration, warm-started
+ALS_BLOCK_NNZ = 1 << 18  # nonzeros per solve block, bounding the gathered factor rows' memory
+ALS_WORKERS = int(os.getenv("ALS_WORKERS", str(min(4, os.cpu_count() or 1))))
+SERVE_BLOCK_ROWS = 1024  # students scored per block in recommend_batch
+
+
+def build_click_matrix(chunks, site_ids=None):
+    """
+    Sparse student x material click matrix from studentVle chunks
+
+    sum_click is totalled per (id_student, id_site) one chunk at a time,
+    so only the aggregated pairs are held in memory (ids must fit in 32 bits). Columns follow
+    site_ids when given (other materials are dropped), otherwise every
+    id_site seen in sorted order.
+    Returns (CSR matrix, student ids, site ids).
+    """
+    unique = np.zeros(0, dtype=np.int64)
+    totals = np.zeros(0)
+    for chunk in chunks:
+        # One int64 key per (student, site) pair, merged into the running totals with bincount
+        key = (chunk["id_student"].to_numpy(dtype=np.int64) << 32) | chunk["id_site"].to_numpy(dtype=np.int64)
+        unique, inverse = np.unique(np.concatenate([unique, key]), return_inverse=True)
+        weights = np.concatenate([totals, chunk["sum_click"].to_numpy(dtype=np.float64)])
+        totals = np.bincount(inverse, weights=weights, minlength=len(unique))
+    values = totals.astype(np.float32)
+    students = unique >> 32
+    sites = unique & 0xFFFFFFFF
+    if site_ids is None:
+        site_ids, columns = np.unique(sites, return_inverse=True)
+    else:
+        site_ids = np.asarray(site_ids)
+        order = np.argsort(site_ids)
+        positions = np.minimum(np.searchsorted(site_ids, sites, sorter=order), len(site_ids) - 1)
+        known = site_ids[order[positions]] == sites
+        students, values, columns = students[known], values[known], order[positions[known]]
+    student_ids, rows = np.unique(students, return_inverse=True)
+    matrix = sparse.csr_matrix((values, (rows, columns)), shape=(len(student_ids), len(site_ids)))
+    return matrix, student_ids, site_ids
+
+
+def _nnz_blocks(indptr, block_nnz=ALS_BLOCK_NNZ):
+    """Split rows into contiguous ranges holding about block_nnz nonzeros each"""
+    cuts = np.searchsorted(indptr, np.arange(block_nnz, indptr[-1], block_nnz))
+    bounds = np.unique(np.concatenate([[0], cuts, [len(indptr) - 1]]))
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def _cg_block(factors, other, gram, confidence, start, stop, cg_steps):
+    """
+    Conjugate-gradient steps for rows start:stop of one ALS half-step
+
+    Each row u solves (Y^T Y + lambda I + Y^T (C_u - I) Y) x_u = Y^T C_u p_u.
+    The sparse term is applied as a gather of the rows' item factors, a dot
+    product per nonzero and a sparse x dense product, so no per-row matrix
+    is ever formed; every row runs its own CG in lockstep with the others.
+    """
+    block = confidence[start:stop]
+    if not block.nnz:
+        return
+    entry_rows = np.repeat(np.arange(stop - start), np.diff(block.indptr))
+    gathered = other[block.indices]
+
+    def apply(v):
+        dots = np.einsum("ij,ij->i", gathered, v[entry_rows])
+        weighted = sparse.csr_matrix((block.data * dots, block.indices, block.indptr), shape=block.shape)
+        return v @ gram + weighted @ other
+
+    x = factors[start:stop].copy()
+    target = sparse.csr_matrix((block.data + 1, block.indices, block.indptr), shape=block.shape) @ other
+    r = target - apply(x)
+    p = r.copy()
+    rs_old = np.einsum("ij,ij->i", r, r)
+    for _ in range(cg_steps):
+        ap = apply(p)
+        step = np.divide(rs_old, np.einsum("ij,ij->i", p, ap), out=np.zeros_like(rs_old), where=rs_old > 1e-12)
+        x += step[:, np.newaxis] * p
+        r -= step[:, np.newaxis] * ap
+        rs_new = np.einsum("ij,ij->i", r, r)
+        p = r + np.divide(rs_new, rs_old, out=np.zeros_like(rs_new), where=rs_old > 1e-12)[:, np.newaxis] * p
+        rs_old = rs_new
+    factors[start:stop] = x
+
+
+class ImplicitALSRecommender:
+    """
+    Collaborative filtering over student x material clicks (implicit-feedback ALS)
+
+    Clicks become confidence weights on "this student used this material"
+    and student and item factors are fitted by alternating least squares,
+    each half-step solved with a few warm-started conjugate-gradient steps
+    per row. Rows are solved in blocks of about ALS_BLOCK_NNZ nonzeros on
+    ALS_WORKERS threads. Serving scores students against the item factor
+    matrix and masks what they already used; students without clicks get
+    the most used materials. update_reward() records a click and re-solves
+    just that student's factors against the fixed item factors.
+    """
+
+    def __init__(self, content_items, factors=ALS_FACTORS, regularization=ALS_REGULARIZATION,
+                 alpha=ALS_ALPHA, iterations=ALS_ITERATIONS, cg_steps=ALS_CG_STEPS, workers=ALS_WORKERS,
+                 rng=None):
+        self.content_items = list(content_items)
+        self.item_index = {item: i for i, item in enumerate(self.content_items)}
+        self.factors = factors
+        self.regularization = regularization
+        self.alpha = alpha
+        self.iterations = iterations
+        self.cg_steps = cg_steps
+        self.workers = workers
+        self.rng = rng or np.random.default_rng()
+        self.user_index = {}  # student id -> row in user_factors
+        self.user_factors = np.zeros((0, factors), dtype=np.float32)
+        self.item_factors = np.zeros((len(self.content_items), factors), dtype=np.float32)
+        self.clicks = sparse.csr_matrix((0, len(self.content_items)), dtype=np.float32)
+        self.new_clicks = {}  # student id -> {item index: clicks} recorded since fit()
+        self.popularity = np.zeros(len(self.content_items))
+        self.item_gram = np.zeros((factors, factors))  # item factors' Y^T Y, for fold-in
+        self.fit_stats = None
+
+    def _half_step(self, factors, other, confidence):
+        gram = other.T @ other + self.regularization * np.eye(self.factors, dtype=np.float32)
+        blocks = _nnz_blocks(confidence.indptr)
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="als") as pool:
+            list(pool.map(
+                lambda bounds: _cg_block(factors, other, gram, confidence, *bounds, self.cg_steps), blocks
+            ))
+
+    def fit(self, clicks, student_ids):
+        """
+        Train on a CSR student x item click matrix whose columns follow content_items
+        Returns (and keeps in fit_stats) training time and memory
+        """
+        start = time.perf_counter()
+        self.clicks = sparse.csr_matrix(clicks, dtype=np.float32)
+        self.user_index = {student_id: row for row, student_id in enumerate(np.asarray(student_ids).tolist())}
+        self.new_clicks = {}
+        confidence = self.clicks.copy()
+        confidence.data = self.alpha * np.log1p(confidence.data)
+        confidence_t = confidence.T.tocsr()
+        scale = 0.01
+        self.user_factors = (self.rng.standard_normal((clicks.shape[0], self.factors)) * scale).astype(np.float32)
+        self.item_factors = (self.rng.standard_normal((clicks.shape[1], self.factors)) * scale).astype(np.float32)
+        iteration_seconds = []
+        for _ in range(self.iterations):
+            iteration_start = time.perf_counter()
+            self._half_step(self.user_factors, self.item_factors, confidence)
+            self._half_step(self.item_factors, self.user_factors, confidence_t)
+            iteration_seconds.append(time.perf_counter() - iteration_start)
+        self.popularity = np.diff(confidence_t.indptr).astype(float)
+        self.item_gram = self.item_factors.T.astype(np.float64) @ self.item_factors
+
+        def csr_bytes(matrix):
+            return matrix.data.nbytes + matrix.indices.nbytes + matrix.indptr.nbytes
+
+        self.fit_stats = {
+            "students": clicks.shape[0],
+            "items": clicks.shape[1],
+            "nonzeros": int(self.clicks.nnz),
+            "seconds": time.perf_counter() - start,
+            "iteration_seconds": iteration_seconds,
+            "matrix_bytes": csr_bytes(self.clicks) + csr_bytes(confidence) + csr_bytes(confidence_t),
+            "factor_bytes": self.user_factors.nbytes + self.item_factors.nbytes,
+            # Largest per-block gather of factor rows, per worker
+            "block_bytes": ALS_BLOCK_NNZ * self.factors * 4,
+        }
+        return self.fit_stats
+
+    def _trained_row(self, student_id):
+        """Student's row in the training clicks, or None if they joined after fit()"""
+        row = self.user_index.get(student_id)
+        return row if row is not None and row < self.clicks.shape[0] else None
+
+    def _seen(self, student_id):
+        """Item indices a student has already used"""
+        row = self._trained_row(student_id)
+        seen = [] if row is None else self.clicks.indices[self.clicks.indptr[row]:self.clicks.indptr[row + 1]].tolist()
+        return seen + list(self.new_clicks.get(student_id, ()))
+
+    def recommend(self, student_id, k=3, consumed=()):
+        """Top k items for one student, best first, skipping items already used"""
+        return self.recommend_batch([student_id], k, {student_id: consumed})[student_id]
+
+    def recommend_batch(self, student_ids, k=3, consumed=None, rng=None):
+        """
+        Top-k recommendations for many students in one call
+
+        Known students are scored as user factors x item factors in blocks
+        of SERVE_BLOCK_ROWS; students without clicks rank by popularity.
+        Items already clicked or listed in `consumed` are masked out.
+        Returns {student_id: [items, best first]}.
+        """
+        consumed = consumed or {}
+        k = min(k, len(self.content_items))
+        items = np.array(self.content_items, dtype=object)
+        recommendations = {}
+        student_ids = list(student_ids)
+        for start in range(0, len(student_ids), SERVE_BLOCK_ROWS):
+            block = student_ids[start:start + SERVE_BLOCK_ROWS]
+            rows = np.array([self.user_index.get(student_id, -1) for student_id in block])
+            scores = np.repeat(self.popularity[np.newaxis].astype(np.float32), len(block), axis=0)
+            known = rows >= 0
+            scores[known] = self.user_factors[rows[known]] @ self.item_factors.T
+            for n, student_id in enumerate(block):
+                masked = self._seen(student_id) + [
+                    self.item_index[item] for item in consumed.get(student_id, ()) if item in self.item_index
+                ]
+                scores[n, masked] = -np.inf
+            if k == 0:
+                top = np.zeros((len(block), 0), dtype=np.int64)
+            else:
+                top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+                top = np.take_along_axis(top, np.argsort(-np.take_along_axis(scores, top, axis=1), axis=1), axis=1)
+            for n, student_id in enumerate(block):
+                picks = top[n][scores[n, top[n]] > -np.inf]
+                recommendations[student_id] = items[picks].tolist()
+        return recommendations
+
+    def get_recommendation(self, student_profile=None):
+        """
+        Get content recommendation for a student
+        Using the student's factors (profile "id"), or popularity for unknown students
+        """
+        picks = self.recommend((student_profile or {}).get("id"), k=1)
+        return picks[0] if picks else self.content_items[int(np.argmax(self.popularity))]
+
+    def update_reward(self, item, reward, student_profile=None):
+        """
+        Record a click and fold it into the student's factors (item factors stay fixed)
+        """
+        student_id = (student_profile or {}).get("id")
+        if student_id is None or reward <= 0:
+            return
+        index = self.item_index[item]
+        added = self.new_clicks.setdefault(student_id, {})
+        added[index] = added.get(index, 0.0) + reward
+        row = self._trained_row(student_id)
+        clicks = {}
+        if row is not None:
+            start, stop = self.clicks.indptr[row], self.clicks.indptr[row + 1]
+            clicks = dict(zip(self.clicks.indices[start:stop].tolist(), self.clicks.data[start:stop].tolist()))
+        elif student_id in self.user_index:
+            row = self.user_index[student_id]
+        else:
+            row = len(self.user_index)
+            self.user_index[student_id] = row
+            if row == len(self.user_factors):
+                # Grow geometrically so adding students is amortized O(factors)
+                grow = max(16, len(self.user_factors))
+                self.user_factors = np.concatenate([self.user_factors, np.zeros((grow, self.factors), dtype=np.float32)])
+        if index not in clicks and added[index] == reward:
+            self.popularity[index] += 1  # first click by this student
+        for added_index, value in added.items():
+            clicks[added_index] = clicks.get(added_index, 0.0) + value
+        # Exact solve of the student's least-squares system over their items
+        indices = np.fromiter(clicks, dtype=np.int64, count=len(clicks))
+        confidence = self.alpha * np.log1p(np.fromiter(clicks.values(), dtype=np.float64, count=len(clicks)))
+        y = self.item_factors[indices].astype(np.float64)
+        a = self.item_gram + (y.T * confidence) @ y + self.regularization * np.eye(self.factors)
+        self.user_factors[row] = np.linalg.solve(a, y.T @ (confidence + 1))
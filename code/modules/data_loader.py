@@ -1,5 +1,8 @@
 import pandas as pd
 import numpy as np
+from modules.rbac import scoped_loader
+from modules.auth import get_preferences_for_users
+from modules.student_data import get_all_real_students, get_class_rosters
 
 
 def load_student_data(source="mock"):
@@ -39,3 +42,60 @@ def process_interaction_data(student_id):
         "quiz_attempts": np.random.randint(1, 5),
         "forum_posts": np.random.randint(0, 10),
     }
+
+
+def _visible_classes(scope, username):
+    """Classes a user may see under their data scope"""
+    rosters = get_class_rosters()
+    if scope == "all":
+        return list(rosters)
+    if scope == "own_classes":
+        return [name for name, roster in rosters.items() if roster["teacher"] == username]
+    return [name for name, roster in rosters.items() if username in roster["students"]]
+
+
+def _class_roster(access, class_name):
+    scope, username = access
+    if class_name not in _visible_classes(scope, username):
+        return []
+    students = get_class_rosters()[class_name]["students"]
+    if scope == "self":
+        return [username] if username in students else []
+    return list(students)
+
+
+@scoped_loader("view_student_progress")
+def load_classes(access):
+    """
+    Names of the classes the current user may see
+    """
+    return _visible_classes(*access)
+
+
+@scoped_loader("view_student_progress")
+def load_class_roster(access, class_name):
+    """
+    Usernames of the students in a class, or [] if it is out of scope
+    """
+    return _class_roster(access, class_name)
+
+
+@scoped_loader("view_student_progress")
+def load_class_preferences(access, class_name):
+    """
+    Saved learning preferences for a class, reading only its students' rows
+    """
+    return get_preferences_for_users(_class_roster(access, class_name))
+
+
+@scoped_loader("view_student_progress")
+def load_student_profiles(access, class_name):
+    """
+    Student profiles for a class, limited to the students in scope
+    """
+    profiles = get_all_real_students()
+    return {
+        username: profiles[username]
+        for username in _class_roster(access, class_name)
+        if username in profiles
+    }
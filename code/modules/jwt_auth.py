@@ -1,9 +1,15 @@
 # jwt_auth.py
 import jwt
+import time
+import hashlib
 import datetime
+import threading
 import streamlit as st
 import os
+import uuid
+from collections import OrderedDict
 from dotenv import load_dotenv
+from modules.token_revocation import get_revocation_store
 
 # Load environment variables
 load_dotenv()
@@ -11,6 +17,18 @@ SECRET_KEY = os.getenv(
     "JWT_SECRET_KEY", "your-default-secret-key"
 )  # Use environment variable in production
 
+# Verified payloads are cached so reruns skip signature checks
+TOKEN_CACHE_SIZE = 4096
+TOKEN_CACHE_TTL = 300  # seconds; a cached entry never outlives the token's own exp
+
+_token_cache = OrderedDict()  # token digest -> (payload, cached_until)
+_token_cache_lock = threading.Lock()
+_token_cache_stats = {"hits": 0, "misses": 0}
+
+
+def _token_digest(token):
+    return hashlib.sha256(token.encode()).hexdigest()
+
 
 def generate_token(username, role):
     """Generate a JWT token for the user"""
@@ -19,13 +37,15 @@ def generate_token(username, role):
         "role": role,
         "exp": datetime.datetime.utcnow()
         + datetime.timedelta(hours=24),  # 24 hour expiration
+        "jti": uuid.uuid4().hex,  # lets a single token be revoked
+        "ver": get_revocation_store().user_version(username),
     }
     token = jwt.encode(payload, SECRET_KEY, algorithm="HS256")
     return token
 
 
-def verify_token(token):
-    """Verify a JWT token and return the payload if valid"""
+def _decode_token(token):
+    """Verify a JWT token without the cache"""
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=["HS256"])
         return True, payload
@@ -34,3 +54,67 @@ def verify_token(token):
     except jwt.InvalidTokenError:
         return False, "Invalid token"
 
+
+def _verify_signature(token):
+    """Verify a JWT token, using the verified-token cache"""
+    digest = _token_digest(token)
+    now = time.time()
+    with _token_cache_lock:
+        entry = _token_cache.get(digest)
+        if entry is not None:
+            payload, cached_until = entry
+            if now < cached_until:
+                _token_cache.move_to_end(digest)
+                _token_cache_stats["hits"] += 1
+                return True, payload
+            del _token_cache[digest]
+        _token_cache_stats["misses"] += 1
+
+    valid, payload = _decode_token(token)
+    if valid:
+        cached_until = min(now + TOKEN_CACHE_TTL, payload.get("exp", now))
+        with _token_cache_lock:
+            _token_cache[digest] = (payload, cached_until)
+            _token_cache.move_to_end(digest)
+            if len(_token_cache) > TOKEN_CACHE_SIZE:
+                _token_cache.popitem(last=False)
+    return valid, payload
+
+
+def verify_token(token):
+    """Verify a JWT token and return the payload if valid"""
+    valid, payload = _verify_signature(token)
+    # Revocation is checked even for cached payloads, since it may have been
+    # recorded by another process
+    if valid and get_revocation_store().is_revoked(payload):
+        invalidate_cached_token(token)
+        return False, "Token has been revoked"
+    return valid, payload
+
+
+def revoke_token(token):
+    """Revoke a single token (e.g. on logout) until it expires"""
+    valid, payload = _verify_signature(token)
+    invalidate_cached_token(token)
+    if valid and "jti" in payload:
+        get_revocation_store().revoke_token(payload["jti"], payload["exp"])
+
+
+def revoke_user_tokens(username):
+    """Revoke every token issued to a user so far"""
+    get_revocation_store().revoke_user_tokens(username)
+    invalidate_cached_token()
+
+
+def invalidate_cached_token(token=None):
+    """Drop one token (or every token) from the verified-token cache"""
+    with _token_cache_lock:
+        if token is None:
+            _token_cache.clear()
+        else:
+            _token_cache.pop(_token_digest(token), None)
+
+
+def token_cache_stats():
+    with _token_cache_lock:
+        return {**_token_cache_stats, "size": len(_token_cache)}
@@ -0,0 +1,220 @@
+# login_log.py
+import os
+import glob
+import time
+import atexit
+import threading
+from modules.user_store import DATA_DIR, get_user_store
+from modules.user_cache import get_user_cache
+
+LOGIN_LOG = os.path.join(DATA_DIR, "login_events.log")
+
+# Per-login fields, written in this order after the username on each log line
+LOGIN_FIELDS = ["last_login"]
+
+FLUSH_BATCH_SIZE = 64  # events buffered before a flush
+FLUSH_INTERVAL = 2.0  # seconds an event may sit in the buffer
+COMPACT_INTERVAL = 300  # seconds between folds of the log into the user table
+# Age after which another process's *.compacting file is treated as left
+# behind by a crash and folded by this one
+STALE_COMPACTING_AGE = 60
+
+
+class LoginEventLog:
+    """
+    Append-only log of per-login fields (e.g. last_login)
+
+    Successful logins are buffered in memory and appended to the log file in
+    batches, so a login never rewrites the user table. A background compactor
+    periodically folds the latest value per user back into the user store and
+    truncates the log. If writing to the store fails, the moved-aside log is
+    kept and folded again by the next compaction.
+    """
+
+    def __init__(self, path=LOGIN_LOG, store=None):
+        self.path = path
+        self.store = store
+        self._lock = threading.Lock()
+        self._buffer = []
+        self._last_flush = time.monotonic()
+        # Latest fields per user read from the log file, plus the read position
+        self._latest = {}
+        self._offset = 0
+        self._file_id = None
+        # Fields from moved-aside logs whose compaction has not succeeded yet
+        self._unapplied = {}
+        self._stop = threading.Event()
+        self._compactor = None
+
+    def _get_store(self):
+        return self.store if self.store is not None else get_user_store()
+
+    def record(self, username, **fields):
+        """Buffer a login event, flushing if the batch is full or stale"""
+        line = "\t".join([username] + [str(fields.get(f) or "") for f in LOGIN_FIELDS]) + "\n"
+        with self._lock:
+            self._buffer.append(line)
+            if (
+                len(self._buffer) >= FLUSH_BATCH_SIZE
+                or time.monotonic() - self._last_flush >= FLUSH_INTERVAL
+            ):
+                self._flush_locked()
+
+    def flush(self):
+        """Append all buffered events to the log file"""
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        if self._buffer:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write("".join(self._buffer))
+            self._buffer = []
+        self._last_flush = time.monotonic()
+
+    def _read_new_events_locked(self):
+        """Fold lines appended since the last read into the latest-state map"""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            self._latest, self._offset, self._file_id = {}, 0, None
+            return
+        file_id = (stat.st_dev, stat.st_ino)
+        if file_id != self._file_id or stat.st_size < self._offset:
+            # The log was compacted (by this or another process); start over
+            self._latest, self._offset, self._file_id = {}, 0, file_id
+        if stat.st_size == self._offset:
+            return
+        with open(self.path, "r", encoding="utf-8") as f:
+            f.seek(self._offset)
+            for line in f:
+                if not line.endswith("\n"):
+                    # Partially written line; pick it up on the next read
+                    break
+                self._offset += len(line.encode("utf-8"))
+                self._apply_line(self._latest, line)
+
+    @staticmethod
+    def _apply_line(latest, line):
+        parts = line.rstrip("\n").split("\t")
+        fields = {f: v for f, v in zip(LOGIN_FIELDS, parts[1:]) if v}
+        if fields:
+            latest.setdefault(parts[0], {}).update(fields)
+
+    def latest(self):
+        """Return {username: {field: value}} for events not yet compacted"""
+        with self._lock:
+            self._read_new_events_locked()
+            latest = {user: dict(fields) for user, fields in self._unapplied.items()}
+            for user, fields in self._latest.items():
+                latest.setdefault(user, {}).update(fields)
+            for line in self._buffer:
+                self._apply_line(latest, line)
+        return latest
+
+    def merge_into(self, users_df):
+        """Overlay pending login fields onto a user table read from the store"""
+        latest = self.latest()
+        if not latest or users_df.empty:
+            return users_df
+        users_df = users_df.copy()
+        for field in LOGIN_FIELDS:
+            values = users_df["username"].map(lambda u: latest.get(u, {}).get(field))
+            users_df[field] = values.where(values.notna(), users_df[field])
+        return users_df
+
+    def _leftover_files(self):
+        """
+        Moved-aside logs not yet folded: this process's failed compactions and
+        stale ones from other processes, oldest first
+        """
+        leftovers = []
+        for path in glob.glob(f"{glob.escape(self.path)}.*.*.compacting"):
+            # <log>.<pid>.<time_ns>.compacting
+            pid, created = path[len(self.path) + 1:-len(".compacting")].split(".", 1)
+            try:
+                stale = time.time() - os.path.getmtime(path) >= STALE_COMPACTING_AGE
+            except FileNotFoundError:
+                continue
+            if pid == str(os.getpid()) or stale:
+                leftovers.append((int(created), path))
+        return [path for _, path in sorted(leftovers)]
+
+    def compact(self):
+        """Fold the log (and any leftover moved-aside logs) into the user store and truncate it"""
+        with self._lock:
+            self._flush_locked()
+            files = self._leftover_files()
+            if os.path.exists(self.path):
+                # Move the log aside so concurrent writers start a fresh file
+                compacting = f"{self.path}.{os.getpid()}.{time.time_ns()}.compacting"
+                os.replace(self.path, compacting)
+                os.utime(compacting)  # mark when it was moved, for the staleness check
+                files.append(compacting)
+            if not files:
+                return 0
+            latest = {}
+            for path in files:
+                with open(path, "r", encoding="utf-8") as f:
+                    for line in f:
+                        self._apply_line(latest, line)
+            self._latest, self._offset, self._file_id = {}, 0, None
+            # Write back while holding the lock so readers never see a gap; on
+            # failure the files stay for the next compaction
+            self._unapplied = latest
+            if latest:
+                self._get_store().update_users(latest)
+                get_user_cache().invalidate()
+            self._unapplied = {}
+        for path in files:
+            os.remove(path)
+        return len(latest)
+
+    def start_compactor(self, interval=COMPACT_INTERVAL):
+        """Start the background compaction thread (once per process)"""
+        if self._compactor is not None:
+            return
+
+        def compact():
+            try:
+                self.compact()
+            except Exception:
+                pass  # the moved-aside log is kept and retried next time
+
+        def run():
+            # Fold logs left behind by a crashed or failed compaction first
+            if self._leftover_files():
+                compact()
+            # Wake often enough to flush stale buffers; compact less frequently
+            last_compact = time.monotonic()
+            while not self._stop.wait(min(FLUSH_INTERVAL, interval)):
+                if time.monotonic() - last_compact >= interval:
+                    compact()
+                    last_compact = time.monotonic()
+                else:
+                    self.flush()
+
+        self._compactor = threading.Thread(target=run, name="login-log-compactor", daemon=True)
+        self._compactor.start()
+
+    def stop(self):
+        """Stop the compactor and flush anything still buffered"""
+        self._stop.set()
+        self.flush()
+
+
+_log = None
+_log_lock = threading.Lock()
+
+
+def get_login_log():
+    """Return the process-wide login event log, starting its compactor"""
+    global _log
+    if _log is None:
+        with _log_lock:
+            if _log is None:
+                _log = LoginEventLog()
+                _log.start_compactor()
+                atexit.register(_log.stop)
+    return _log
@@ -0,0 +1,91 @@
+# migrations.py
+import time
+
+
+def _rename_learning_style(users):
+    """Older files stored the learning preference as learning_style"""
+    if "learning_style" in users.columns:
+        if "learning_preference" not in users.columns:
+            users = users.rename(columns={"learning_style": "learning_preference"})
+        else:
+            users = users.drop(columns=["learning_style"])
+    if "learning_preference" not in users.columns:
+        users["learning_preference"] = None
+    return users
+
+
+def _add_pace_and_format(users):
+    for col in ["preferred_pace", "content_format"]:
+        if col not in users.columns:
+            users[col] = None
+    return users
+
+
+def _move_preferences(users):
+    """Learning preferences live in their own store, apart from credentials"""
+    from modules.preference_store import PREFERENCE_FIELDS, get_preference_store
+
+    present = [col for col in PREFERENCE_FIELDS if col in users.columns]
+    if present:
+        get_preference_store().import_frame(users[["username"] + present])
+        users = users.drop(columns=present)
+    return users
+
+
+# Ordered (version, description, transform) steps. Each transform takes and
+# returns the user DataFrame and must be idempotent.
+MIGRATIONS = [
+    (1, "Rename learning_style to learning_preference", _rename_learning_style),
+    (2, "Add preferred_pace and content_format columns", _add_pace_and_format),
+    (3, "Move learning preferences to the preference store", _move_preferences),
+]
+
+LATEST_SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+def apply_migrations(users, from_version=0):
+    """Apply all migrations newer than from_version to a user DataFrame"""
+    for version, _, transform in MIGRATIONS:
+        if version > from_version:
+            users = transform(users)
+    return users
+
+
+def run_migrations(store):
+    """
+    Upgrade a user store to LATEST_SCHEMA_VERSION
+
+    Runs once at startup and from the admin maintenance tab. Returns a list
+    of {"version", "description", "seconds"} for each step applied; an
+    up-to-date store returns an empty list without reading any users.
+    """
+    current = store.schema_version()
+    if current >= LATEST_SCHEMA_VERSION:
+        return []
+
+    results = []
+    users = store.load_raw()
+    for version, description, transform in MIGRATIONS:
+        if version <= current:
+            continue
+        start = time.perf_counter()
+        users = transform(users)
+        results.append({"version": version, "description": description, "seconds": time.perf_counter() - start})
+
+    start = time.perf_counter()
+    store.replace_all(users)
+    store.set_schema_version(LATEST_SCHEMA_VERSION)
+    results.append({"version": LATEST_SCHEMA_VERSION, "description": "Write migrated users", "seconds": time.perf_counter() - start})
+    return results
+
+
+if __name__ == "__main__":
+    # Admin command: python -m modules.migrations (from the code/ directory)
+    from modules.user_store import create_user_store
+
+    store = create_user_store()
+    steps = run_migrations(store)
+    if not steps:
+        print(f"User store already at schema version {store.schema_version()}")
+    for step in steps:
+        print(f"v{step['version']}: {step['description']} ({step['seconds'] * 1000:.1f} ms)")
@@ -0,0 +1,137 @@
+# password_hasher.py
+import os
+import hmac
+import base64
+import hashlib
+import secrets
+from concurrent.futures import ThreadPoolExecutor
+from dotenv import load_dotenv
+
+# Hashing algorithm and cost, tunable per deployment (see benchmarks/login_throughput.py)
+load_dotenv()
+PASSWORD_HASHER = os.getenv("PASSWORD_HASHER", "scrypt" if hasattr(hashlib, "scrypt") else "pbkdf2_sha256")
+PBKDF2_ITERATIONS = int(os.getenv("PBKDF2_ITERATIONS", "600000"))
+SCRYPT_N = int(os.getenv("SCRYPT_N", str(2 ** 14)))
+SCRYPT_R = int(os.getenv("SCRYPT_R", "8"))
+SCRYPT_P = int(os.getenv("SCRYPT_P", "1"))
+HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+SALT_BYTES = 16
+
+
+def _b64(data):
+    return base64.b64encode(data).decode("ascii").rstrip("=")
+
+
+def _unb64(text):
+    return base64.b64decode(text + "=" * (-len(text) % 4))
+
+
+class Pbkdf2Hasher:
+    """PBKDF2-HMAC-SHA256, encoded as pbkdf2_sha256$iterations$salt$hash"""
+
+    algorithm = "pbkdf2_sha256"
+
+    def __init__(self, iterations=PBKDF2_ITERATIONS):
+        self.iterations = iterations
+
+    def encode(self, password, salt=None, iterations=None):
+        salt = salt or secrets.token_bytes(SALT_BYTES)
+        iterations = iterations or self.iterations
+        digest = hashlib.pbkdf2_hmac("sha256", password.encode(), salt, iterations)
+        return f"{self.algorithm}${iterations}${_b64(salt)}${_b64(digest)}"
+
+    def verify(self, password, encoded):
+        _, iterations, salt, _ = encoded.split("$")
+        return hmac.compare_digest(self.encode(password, _unb64(salt), int(iterations)), encoded)
+
+    def needs_rehash(self, encoded):
+        return int(encoded.split("$")[1]) != self.iterations
+
+
+class ScryptHasher:
+    """scrypt, encoded as scrypt$n$r$p$salt$hash"""
+
+    algorithm = "scrypt"
+
+    def __init__(self, n=SCRYPT_N, r=SCRYPT_R, p=SCRYPT_P):
+        self.n, self.r, self.p = n, r, p
+
+    def encode(self, password, salt=None, n=None, r=None, p=None):
+        salt = salt or secrets.token_bytes(SALT_BYTES)
+        n, r, p = n or self.n, r or self.r, p or self.p
+        digest = hashlib.scrypt(
+            password.encode(), salt=salt, n=n, r=r, p=p, maxmem=256 * n * r + (1 << 20), dklen=32
+        )
+        return f"{self.algorithm}${n}${r}${p}${_b64(salt)}${_b64(digest)}"
+
+    def verify(self, password, encoded):
+        _, n, r, p, salt, _ = encoded.split("$")
+        return hmac.compare_digest(self.encode(password, _unb64(salt), int(n), int(r), int(p)), encoded)
+
+    def needs_rehash(self, encoded):
+        _, n, r, p = encoded.split("$")[:4]
+        return (int(n), int(r), int(p)) != (self.n, self.r, self.p)
+
+
+class LegacySha256Hasher:
+    """Unsalted SHA-256 hex digests from before encoded hashes; verify only"""
+
+    algorithm = "sha256"
+
+    def verify(self, password, encoded):
+        return hmac.compare_digest(hashlib.sha256(password.encode()).hexdigest(), encoded)
+
+    def needs_rehash(self, encoded):
+        return True
+
+
+HASHERS = {hasher.algorithm: hasher for hasher in [Pbkdf2Hasher, ScryptHasher]}
+
+
+def get_hasher(algorithm=PASSWORD_HASHER):
+    """Return the hasher used for new passwords"""
+    if algorithm not in HASHERS:
+        raise ValueError(f"Unknown PASSWORD_HASHER: {algorithm}")
+    return HASHERS[algorithm]()
+
+
+def _hasher_for(encoded):
+    """Pick the hasher that produced an encoded hash"""
+    if "$" not in encoded:
+        return LegacySha256Hasher()
+    algorithm = encoded.split("$", 1)[0]
+    if algorithm not in HASHERS:
+        raise ValueError(f"Unknown password hash algorithm: {algorithm}")
+    return HASHERS[algorithm]()
+
+
+_hasher = get_hasher()
+
+# KDF work releases the GIL, so a bounded pool keeps hashing off the script
+# threads' interpreter time and caps concurrent CPU use during login storms
+_executor = ThreadPoolExecutor(max_workers=HASH_WORKERS, thread_name_prefix="password-hash")
+
+
+def hash_password(password, hasher=None):
+    """Hash a new password with the configured algorithm"""
+    return (hasher or _hasher).encode(password)
+
+
+def verify_password(password, encoded, hasher=None):
+    """
+    Check a password against a stored hash on the hashing pool
+
+    Returns (valid, new_hash) where new_hash is a re-encoded hash when the
+    stored one uses a legacy algorithm or outdated cost, else None.
+    """
+    if not isinstance(encoded, str) or not encoded:
+        return False, None
+    hasher = hasher or _hasher
+    stored_hasher = _hasher_for(encoded)
+    valid = _executor.submit(stored_hasher.verify, password, encoded).result()
+    if not valid:
+        return False, None
+    if stored_hasher.algorithm != hasher.algorithm or hasher.needs_rehash(encoded):
+        return True, _executor.submit(hasher.encode, password).result()
+    return True, None
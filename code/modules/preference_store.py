@@ -0,0 +1,194 @@
+# preference_store.py
+import os
+import sqlite3
+import threading
+import pandas as pd
+from modules.user_store import DATA_DIR, USER_STORE_BACKEND
+
+PREFERENCES_DB = os.path.join(DATA_DIR, "preferences.db")
+PREFERENCES_CSV = os.path.join(DATA_DIR, "preferences.csv")
+
+PREFERENCE_FIELDS = ["learning_preference", "preferred_pace", "content_format"]
+
+# Values offered for each preference on the learning path page
+PREFERENCE_OPTIONS = {
+    "learning_preference": ["Visual/Interactive", "Reading/Text", "Auditory/Visual", "Kinesthetic/Hands-on", "Mixed"],
+    "preferred_pace": ["Slow", "Moderate", "Fast", "Self-paced"],
+    "content_format": [
+        "Videos + Quizzes",
+        "Articles + Quizzes",
+        "Video + Practice Problems",
+        "Interactive Simulations",
+        "Videos + Discussions",
+        "Mixed Content",
+    ],
+}
+
+# SQLite limits the number of bound parameters per statement
+_BATCH_SIZE = 500
+
+
+def _check_fields(fields):
+    unknown = set(fields) - set(PREFERENCE_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown preference fields: {', '.join(sorted(unknown))}")
+
+
+def _empty_preferences():
+    return {field: None for field in PREFERENCE_FIELDS}
+
+
+class PreferenceStore:
+    """
+    Learning preferences keyed by username, kept apart from credentials
+    """
+
+    def get(self, username):
+        """Return one user's preferences, or None if none were ever saved"""
+        return self.get_many([username]).get(username)
+
+    def get_many(self, usernames):
+        """Return {username: preferences} for the given users in one read"""
+        raise NotImplementedError
+
+    def upsert(self, username, **fields):
+        """Set only the given fields for one user, leaving the others untouched"""
+        raise NotImplementedError
+
+    def import_frame(self, prefs_df):
+        """Bulk upsert non-empty values from a DataFrame with a username column"""
+        raise NotImplementedError
+
+
+class CsvPreferenceStore(PreferenceStore):
+    """
+    Whole-file CSV storage, suitable for small installs
+    """
+
+    def __init__(self, path=PREFERENCES_CSV):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return pd.DataFrame(columns=["username"] + PREFERENCE_FIELDS, dtype=object)
+        return pd.read_csv(self.path, dtype=object).set_index("username", drop=False)
+
+    def get_many(self, usernames):
+        prefs = self._load()
+        rows = prefs[prefs["username"].isin(list(usernames))]
+        return {
+            row["username"]: {f: (None if pd.isna(row[f]) else row[f]) for f in PREFERENCE_FIELDS}
+            for row in rows.to_dict("records")
+        }
+
+    def upsert(self, username, **fields):
+        _check_fields(fields)
+        self.import_frame(pd.DataFrame([{"username": username, **fields}]))
+
+    def import_frame(self, prefs_df):
+        with self._lock:
+            prefs = self._load().reset_index(drop=True)
+            for field in PREFERENCE_FIELDS:
+                prefs[field] = prefs[field].astype(object)
+            index = dict(zip(prefs["username"], prefs.index))
+            new_rows = {}
+            for record in prefs_df.to_dict("records"):
+                values = {f: record[f] for f in PREFERENCE_FIELDS if f in record and not pd.isna(record[f])}
+                if record["username"] in index:
+                    for field, value in values.items():
+                        prefs.at[index[record["username"]], field] = value
+                elif values:
+                    new_rows.setdefault(
+                        record["username"], {"username": record["username"], **_empty_preferences()}
+                    ).update(values)
+            if new_rows:
+                prefs = pd.concat([prefs, pd.DataFrame(list(new_rows.values()))], ignore_index=True)
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            prefs.to_csv(self.path, index=False)
+
+
+class SqlitePreferenceStore(PreferenceStore):
+    """
+    SQLite storage with column-level upserts and batched multi-user reads
+    """
+
+    def __init__(self, path=PREFERENCES_DB):
+        self.path = path
+        self._local = threading.local()
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                f"""
+                CREATE TABLE IF NOT EXISTS preferences (
+                    username TEXT PRIMARY KEY,
+                    {", ".join(f"{field} TEXT" for field in PREFERENCE_FIELDS)}
+                )
+                """
+            )
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get_many(self, usernames):
+        usernames = list(usernames)
+        conn = self._connect()
+        result = {}
+        for i in range(0, len(usernames), _BATCH_SIZE):
+            batch = usernames[i:i + _BATCH_SIZE]
+            rows = conn.execute(
+                f"SELECT username, {', '.join(PREFERENCE_FIELDS)} FROM preferences "
+                f"WHERE username IN ({', '.join('?' for _ in batch)})",
+                batch,
+            )
+            for row in rows:
+                result[row["username"]] = {field: row[field] for field in PREFERENCE_FIELDS}
+        return result
+
+    @staticmethod
+    def _upsert_sql(fields):
+        # Only the given columns are written; existing values in others are kept
+        return (
+            f"INSERT INTO preferences (username, {', '.join(fields)}) "
+            f"VALUES (?, {', '.join('?' for _ in fields)}) "
+            f"ON CONFLICT(username) DO UPDATE SET "
+            f"{', '.join(f'{field} = excluded.{field}' for field in fields)}"
+        )
+
+    def upsert(self, username, **fields):
+        _check_fields(fields)
+        if not fields:
+            return
+        conn = self._connect()
+        with conn:
+            conn.execute(self._upsert_sql(list(fields)), (username, *fields.values()))
+
+    def import_frame(self, prefs_df):
+        conn = self._connect()
+        with conn:
+            for record in prefs_df.to_dict("records"):
+                values = {f: record[f] for f in PREFERENCE_FIELDS if f in record and not pd.isna(record[f])}
+                if values:
+                    conn.execute(self._upsert_sql(list(values)), (record["username"], *values.values()))
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_preference_store():
+    """Return the process-wide preference store for the configured backend"""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = CsvPreferenceStore() if USER_STORE_BACKEND == "csv" else SqlitePreferenceStore()
+    return _store
@@ -0,0 +1,113 @@
+# rate_limiter.py
+import os
+import time
+import threading
+from collections import OrderedDict
+from dotenv import load_dotenv
+
+# Login attempt limits: a burst of `capacity` attempts, then `refill_rate` per second.
+# A client is an IP address, which a whole classroom behind one school NAT can share,
+# so its burst covers everyone logging in at once (with typos) and is configurable.
+load_dotenv()
+USERNAME_CAPACITY = 5
+USERNAME_REFILL_RATE = 1 / 30
+CLIENT_CAPACITY = int(os.getenv("LOGIN_CLIENT_CAPACITY", "200"))
+CLIENT_REFILL_RATE = float(os.getenv("LOGIN_CLIENT_REFILL_RATE", "1"))
+MAX_TRACKED_KEYS = 10000
+
+
+class TokenBucketLimiter:
+    """
+    Per-key token buckets with O(1) checks and bounded memory
+
+    Buckets are kept in an OrderedDict in least-recently-used order; once
+    more than max_keys are tracked, the idlest key is evicted (an evicted
+    key simply starts again with a full bucket).
+    """
+
+    def __init__(self, capacity, refill_rate, max_keys=MAX_TRACKED_KEYS):
+        self.capacity = capacity
+        self.refill_rate = refill_rate
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()  # key -> [tokens, last_refill]
+        self._lock = threading.Lock()
+        self.allowed = 0
+        self.rejected = 0
+        self.evictions = 0
+
+    def _refill(self, key, now):
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = [float(self.capacity), now]
+            self._buckets[key] = bucket
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+                self.evictions += 1
+        else:
+            bucket[0] = min(self.capacity, bucket[0] + (now - bucket[1]) * self.refill_rate)
+            bucket[1] = now
+            self._buckets.move_to_end(key)
+        return bucket
+
+    def allow(self, key):
+        """Consume a token for key, returning False if none are left"""
+        with self._lock:
+            bucket = self._refill(key, time.monotonic())
+            if bucket[0] >= 1:
+                bucket[0] -= 1
+                self.allowed += 1
+                return True
+            self.rejected += 1
+            return False
+
+    def peek(self, key):
+        """Check whether key has a token without consuming it"""
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                return True
+            return min(self.capacity, bucket[0] + (time.monotonic() - bucket[1]) * self.refill_rate) >= 1
+
+    def stats(self):
+        return {
+            "allowed": self.allowed,
+            "rejected": self.rejected,
+            "evictions": self.evictions,
+            "tracked_keys": len(self._buckets),
+        }
+
+
+class LoginRateLimiter:
+    """
+    Limits login attempts both per username and per client
+    """
+
+    def __init__(self):
+        self.by_username = TokenBucketLimiter(USERNAME_CAPACITY, USERNAME_REFILL_RATE)
+        self.by_client = TokenBucketLimiter(CLIENT_CAPACITY, CLIENT_REFILL_RATE)
+
+    def allow(self, username, client_id=None):
+        """
+        Record an attempt, returning False if either limit is exceeded
+        client_id must be stable across sessions (an IP address); pass None if it is unknown
+        """
+        if client_id is not None and not self.by_client.allow(client_id):
+            return False
+        return self.by_username.allow(username)
+
+    def is_limited(self, username, client_id=None):
+        """Check whether the next attempt would be rejected, without recording one"""
+        if client_id is not None and not self.by_client.peek(client_id):
+            return True
+        return not self.by_username.peek(username)
+
+    def stats(self):
+        return {"username": self.by_username.stats(), "client": self.by_client.stats()}
+
+
+_login_limiter = LoginRateLimiter()
+
+
+def get_login_limiter():
+    """Return the process-wide login rate limiter"""
+    return _login_limiter
@@ -1,4 +1,5 @@
 # rbac.py
+import functools
 import streamlit as st
 
 # Define permissions
@@ -33,25 +34,79 @@ PERMISSIONS = {
         "view_own_progress",
         "view_recommendations",
         "adjust_own_schedule",
+        "view_resources",
     ],
 }
 
+# Navigation pages in menu order, with the permission each requires (None: any
+# signed-in user). This one table drives both the sidebar menu and routing.
+PAGE_PERMISSIONS = {
+    "Dashboard": None,
+    "User Management": "view_all_users",
+    "Course Management": "view_all_courses",
+    "System Settings": "configure_system",
+    "Class Management": "edit_own_courses",
+    "Student Progress": "view_student_progress",
+    "Content Management": "create_content",
+    "Analytics": "view_class_analytics",
+    "My Learning Path": "view_recommendations",
+    "Performance": "view_own_progress",
+    "Schedule": "adjust_own_schedule",
+    "Resources": "view_resources",
+}
+
+# How much of a shared data set each role may read: everything, the classes
+# they teach, or only their own rows
+DATA_SCOPES = {
+    "admin": "all",
+    "teacher": "own_classes",
+    "student": "self",
+}
+
+# Compiled at import: one bit per permission, a bitmask and frozenset per role
+PERMISSION_BITS = {
+    permission: 1 << bit
+    for bit, permission in enumerate(sorted({p for perms in PERMISSIONS.values() for p in perms}))
+}
+ROLE_MASKS = {
+    role: functools.reduce(lambda mask, p: mask | PERMISSION_BITS[p], perms, 0)
+    for role, perms in PERMISSIONS.items()
+}
+ROLE_PERMISSIONS = {role: frozenset(perms) for role, perms in PERMISSIONS.items()}
+ROLE_PAGES = {
+    role: tuple(
+        page for page, permission in PAGE_PERMISSIONS.items()
+        if permission is None or ROLE_MASKS[role] & PERMISSION_BITS[permission]
+    )
+    for role in PERMISSIONS
+}
+
+
+@functools.lru_cache(maxsize=None)
+def role_has_permission(role, permission):
+    """Check a permission for a role (memoized per role and permission)"""
+    return bool(ROLE_MASKS.get(role, 0) & PERMISSION_BITS.get(permission, 0))
+
+
+@functools.lru_cache(maxsize=None)
+def can_view_page(role, page):
+    """Check whether a role may open a navigation page"""
+    return page in ROLE_PAGES.get(role, ())
+
 
 def has_permission(required_permission):
     """Check if current user has the required permission"""
     if "role" not in st.session_state:
         return False
 
-    user_role = st.session_state.role
-    user_permissions = PERMISSIONS.get(user_role, [])
-
-    return required_permission in user_permissions
+    return role_has_permission(st.session_state.role, required_permission)
 
 
 def requires_permission(permission):
     """Decorator for functions that require specific permissions"""
 
     def decorator(func):
+        @functools.wraps(func)
         def wrapper(*args, **kwargs):
             if has_permission(permission):
                 return func(*args, **kwargs)
@@ -62,3 +117,25 @@ def requires_permission(permission):
         return wrapper
 
     return decorator
+
+
+def scoped_loader(permission):
+    """
+    Decorator for data loaders that require a permission
+
+    The loader is called with the current user's (scope, username) as its
+    first argument, so it can restrict its query to the rows the user may
+    see instead of filtering a full result afterwards.
+    """
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not has_permission(permission):
+                raise PermissionError(f"Permission required: {permission}")
+            role = st.session_state.role
+            return func((DATA_SCOPES[role], st.session_state.get("username")), *args, **kwargs)
+
+        return wrapper
+
+    return decorator
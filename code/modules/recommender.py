@@ -1,43 +1,758 @@
+import os
+import threading
 import numpy as np
+from dotenv import load_dotenv
+from modules.preference_store import PREFERENCE_OPTIONS
+
+# Recommender used by default (a key of RECOMMENDER_ALGORITHMS) and its UCB exploration rate
+load_dotenv()
+RECOMMENDER_ALGORITHM = os.getenv("RECOMMENDER_ALGORITHM", "Multi-armed Bandit")
+EXPLORATION_PARAM = 0.2
+
+# Per-event discount of DiscountedUCBRecommender: rewards older than about
+# 1 / (1 - DISCOUNT) events carry little weight
+DISCOUNT = 0.999
+# Floor for discounted attempt counts when scoring, so arms idle long enough
+# to underflow to 0 get a large exploration bonus instead of 0/0 = nan
+MIN_DISCOUNTED_ATTEMPTS = 1e-9
+
+# Profile fields that pick a ShardedBanditRecommender shard, and the attempts a
+# shard needs before it is trusted over the global statistics
+SHARD_FIELDS = ("course", "learning_preference")
+COLD_SHARD_ATTEMPTS = 50
+
+# Students scored per block in recommend_batch, bounding the score matrix's memory
+BATCH_BLOCK_ROWS = 1024
+
+# Interaction features (see data_loader.process_interaction_data) and the
+# typical maximum each is scaled by
+INTERACTION_FEATURES = {
+    "login_frequency": 10,
+    "avg_session_duration": 60,
+    "content_interactions": 100,
+    "quiz_attempts": 5,
+    "forum_posts": 10,
+}
+
+
+def consumed_mask(item_index, student_ids, consumed):
+    """
+    Sparse (CSR) mask of consumed items for a list of students
+
+    consumed maps a student id to the items they already used. Returns
+    (indptr, indices): row i's item indices are indices[indptr[i]:indptr[i + 1]].
+    """
+    rows = [
+        [item_index[item] for item in consumed.get(student_id, ()) if item in item_index]
+        for student_id in student_ids
+    ]
+    indptr = np.zeros(len(rows) + 1, dtype=np.int64)
+    np.cumsum([len(row) for row in rows], out=indptr[1:])
+    indices = np.fromiter((index for row in rows for index in row), dtype=np.int64, count=indptr[-1])
+    return indptr, indices
+
+
+def top_k(scores, k):
+    """
+    Column indices of each row's k highest scores, best first, plus a
+    matching mask that is False where a pick was masked out (-inf)
+    """
+    top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    top_scores = np.take_along_axis(scores, top, axis=1)
+    order = np.argsort(-top_scores, axis=1)
+    return np.take_along_axis(top, order, axis=1), np.take_along_axis(top_scores, order, axis=1) > -np.inf
+
+
+def ucb_batch(recommender, base, explore_floor, student_ids, k=3, consumed=None, rng=None):
+    """
+    Top-k of a UCB recommender's base scores for many students (see recommend_batch)
+
+    base holds the score of every tried item; untried items rank above
+    explore_floor in a random order per student.
+    """
+    student_ids = list(student_ids)
+    rng = rng or np.random.default_rng()
+    k = min(k, len(recommender.content_items))
+    if k == 0:
+        return {student_id: [] for student_id in student_ids}
+    indptr, indices = consumed_mask(recommender.item_index, student_ids, consumed or {})
+    untried = np.flatnonzero(recommender.untried)
+    tried = np.flatnonzero(~recommender.untried)
+    items = np.array(recommender.content_items, dtype=object)
+    position = np.full(len(recommender.content_items), -1, dtype=np.int64)
+
+    recommendations = {}
+    for start in range(0, len(student_ids), BATCH_BLOCK_ROWS):
+        stop = min(start + BATCH_BLOCK_ROWS, len(student_ids))
+        row_counts = np.diff(indptr[start:stop + 1])
+        # Tried items share one score row, so a student's top k can only
+        # come from the untried items and the best k + (masked count)
+        # tried ones; score just those columns
+        keep = min(len(tried), k + int(row_counts.max(initial=0)))
+        best_tried = tried[np.argpartition(-base[tried], keep - 1)[:keep]] if keep < len(tried) else tried
+        candidates = np.concatenate([untried, best_tried])
+        scores = np.repeat(base[np.newaxis, candidates], stop - start, axis=0)
+        if len(untried):
+            scores[:, :len(untried)] = explore_floor + rng.random((stop - start, len(untried)), dtype=np.float32)
+
+        # Apply the block's slice of the sparse mask to the candidate columns
+        position[candidates] = np.arange(len(candidates))
+        block_rows = np.repeat(np.arange(stop - start), row_counts)
+        block_columns = position[indices[indptr[start]:indptr[stop]]]
+        hit = block_columns >= 0
+        scores[block_rows[hit], block_columns[hit]] = -np.inf
+        position[candidates] = -1
+
+        top, valid = top_k(scores, min(k, len(candidates)))
+        top = candidates[top]
+        for row, student_id in enumerate(student_ids[start:stop]):
+            recommendations[student_id] = items[top[row][valid[row]]].tolist()
+    return recommendations
 
 
 class MultiArmedBanditRecommender:
     """
     Simple implementation of a multi-armed bandit for content recommendation
+
+    Statistics are kept in NumPy arrays indexed through an item-to-index
+    map, so scoring a large catalog is one vectorized step.
     """
 
-    def __init__(self, content_items, exploration_param=0.2):
-        self.content_items = content_items  # List of content options
+    def __init__(self, content_items, exploration_param=0.2, state_store=None):
+        self.content_items = list(content_items)  # List of content options
         self.exploration_param = exploration_param
-        self.rewards = {item: 0 for item in content_items}
-        self.attempts = {item: 0 for item in content_items}
+        self.item_index = {item: i for i, item in enumerate(self.content_items)}
+        self.reward_sums = np.zeros(len(self.content_items))
+        self.attempt_counts = np.zeros(len(self.content_items), dtype=np.int64)
+        self.total_attempts = 0
+        # Bitmap of items never tried, plus how many are left
+        self.untried = np.ones(len(self.content_items), dtype=bool)
+        self.untried_count = len(self.content_items)
+        # Held while the statistics change or are read, so a reward batch
+        # applied on the ingestion thread is never seen half-applied
+        self.lock = threading.Lock()
+        # Optional BanditStateStore that persists rewards across restarts
+        self.state_store = state_store
+        if state_store is not None:
+            state_store.load_into(self)
+
+    @property
+    def rewards(self):
+        """Total reward per item"""
+        return dict(zip(self.content_items, self.reward_sums.tolist()))
+
+    @property
+    def attempts(self):
+        """Number of attempts per item"""
+        return dict(zip(self.content_items, self.attempt_counts.tolist()))
+
+    def ucb_scores(self):
+        """
+        Upper confidence bound for every item (all items must have been tried)
+        """
+        average_rewards = self.reward_sums / self.attempt_counts
+        exploration_bonus = self.exploration_param * np.sqrt(
+            2 * np.log(self.total_attempts) / self.attempt_counts
+        )
+        return average_rewards + exploration_bonus
 
     def get_recommendation(self, student_profile=None):
         """
         Get content recommendation for a student
         Using Upper Confidence Bound (UCB) algorithm
         """
-        # If we have some items that haven't been tried yet, try them first
-        untried = [item for item, count in self.attempts.items() if count == 0]
-        if untried:
-            return np.random.choice(untried)
-
-        # Calculate UCB for each item
-        total_attempts = sum(self.attempts.values())
-        ucb_values = {}
-        for item in self.content_items:
-            average_reward = self.rewards[item] / self.attempts[item]
-            exploration_bonus = self.exploration_param * np.sqrt(
-                2 * np.log(total_attempts) / self.attempts[item]
+        with self.lock:
+            # If we have some items that haven't been tried yet, try them first
+            if self.untried_count:
+                return self.content_items[np.random.choice(np.flatnonzero(self.untried))]
+
+            # Return the item with the highest UCB value
+            return self.content_items[int(np.argmax(self.ucb_scores()))]
+
+    def update_reward(self, item, reward):
+        """
+        Update the reward for an item after a student interaction
+        """
+        with self.lock:
+            index = self.item_index[item]
+            self.reward_sums[index] += reward
+            if self.untried[index]:
+                self.untried[index] = False
+                self.untried_count -= 1
+            self.attempt_counts[index] += 1
+            self.total_attempts += 1
+            if self.state_store is not None:
+                self.state_store.record(item, reward)
+
+    def apply_rewards(self, indices, rewards):
+        """
+        Apply a batch of rewards given as item indices (repeats accumulate)
+        """
+        with self.lock:
+            np.add.at(self.reward_sums, indices, rewards)
+            np.add.at(self.attempt_counts, indices, 1)
+            self.total_attempts += len(indices)
+            if self.untried_count:
+                self.untried[indices] = False
+                self.untried_count = int(self.untried.sum())
+            if self.state_store is not None:
+                self.state_store.record_many(self.store_positions[indices], rewards)
+
+    def _batch_base_scores(self):
+        """UCB per tried item, and the score untried items start above"""
+        scores = np.zeros(len(self.content_items), dtype=np.float32)
+        tried = ~self.untried
+        if self.total_attempts:
+            counts = self.attempt_counts[tried]
+            scores[tried] = self.reward_sums[tried] / counts + self.exploration_param * np.sqrt(
+                2 * np.log(self.total_attempts) / counts
             )
-            ucb_values[item] = average_reward + exploration_bonus
+        explore_floor = scores[tried].max() + 1 if tried.any() else 0.0
+        return scores, explore_floor
 
-        # Return the item with the highest UCB value
-        return max(ucb_values, key=ucb_values.get)
+    def recommend_batch(self, student_ids, k=3, consumed=None, rng=None):
+        """
+        Top-k recommendations for many students in one call
+
+        Scores a students x items matrix (in blocks of BATCH_BLOCK_ROWS) and
+        picks each row's top k with argpartition. Untried items rank first,
+        in a random order per student so exploration is spread across the
+        roster. Items in `consumed` (student id -> items) are masked out.
+        Returns {student_id: [items, best first]}.
+        """
+        with self.lock:
+            return ucb_batch(self, *self._batch_base_scores(), student_ids, k, consumed, rng)
+
+
+class DiscountedUCBRecommender(MultiArmedBanditRecommender):
+    """
+    Discounted UCB for content whose effectiveness drifts over a presentation
+
+    Every reward is weighted by DISCOUNT ** (events since it arrived), so
+    averages track recent feedback and arms that have not been tried lately
+    regain an exploration bonus. Decay is applied lazily: each arm stores
+    its discounted sums as of the last event that touched it, and reads
+    scale them by DISCOUNT ** (steps since then). An update costs O(1) and
+    each arm holds three numbers however long the stream runs.
+    """
+
+    def __init__(self, content_items, exploration_param=0.2, discount=DISCOUNT):
+        super().__init__(content_items, exploration_param)
+        self.discount = discount
+        self.attempt_counts = np.zeros(len(self.content_items))  # discounted, so fractional
+        self.last_step = np.zeros(len(self.content_items), dtype=np.int64)
+        self.step = 0  # events seen so far
+        self.discounted_total = 0.0
+
+    def decayed(self):
+        """Discounted reward sums and attempt counts as of the current step"""
+        scale = self.discount ** (self.step - self.last_step)
+        return self.reward_sums * scale, self.attempt_counts * scale
+
+    @property
+    def rewards(self):
+        """Discounted total reward per item"""
+        return dict(zip(self.content_items, self.decayed()[0].tolist()))
+
+    @property
+    def attempts(self):
+        """Discounted number of attempts per item"""
+        return dict(zip(self.content_items, self.decayed()[1].tolist()))
+
+    def ucb_scores(self):
+        """
+        Discounted upper confidence bound for every item (all items must have been tried)
+        """
+        reward_sums, attempt_counts = self.decayed()
+        attempt_counts = np.maximum(attempt_counts, MIN_DISCOUNTED_ATTEMPTS)
+        return reward_sums / attempt_counts + self.exploration_param * np.sqrt(
+            2 * np.log(self.discounted_total) / attempt_counts
+        )
 
     def update_reward(self, item, reward):
         """
         Update the reward for an item after a student interaction
         """
-        self.rewards[item] += reward
-        self.attempts[item] += 1
+        with self.lock:
+            index = self.item_index[item]
+            self.step += 1
+            scale = self.discount ** (self.step - self.last_step[index])
+            self.reward_sums[index] = self.reward_sums[index] * scale + reward
+            self.attempt_counts[index] = self.attempt_counts[index] * scale + 1
+            self.last_step[index] = self.step
+            self.discounted_total = self.discounted_total * self.discount + 1
+            if self.untried[index]:
+                self.untried[index] = False
+                self.untried_count -= 1
+            self.total_attempts += 1
+
+    def apply_rewards(self, indices, rewards):
+        """
+        Apply a batch of rewards given as item indices, oldest first
+        """
+        with self.lock:
+            n = len(indices)
+            if not n:
+                return
+            end = self.step + n
+            # Bring the touched arms up to the end of the batch, then add each
+            # event weighted by how many events of the batch came after it
+            touched = np.unique(indices)
+            scale = self.discount ** (end - self.last_step[touched])
+            self.reward_sums[touched] *= scale
+            self.attempt_counts[touched] *= scale
+            weights = self.discount ** np.arange(n - 1, -1, -1)
+            np.add.at(self.reward_sums, indices, weights * rewards)
+            np.add.at(self.attempt_counts, indices, weights)
+            self.last_step[touched] = end
+            self.step = end
+            self.discounted_total = self.discounted_total * self.discount ** n + weights.sum()
+            if self.untried_count:
+                self.untried[touched] = False
+                self.untried_count = int(self.untried.sum())
+            self.total_attempts += n
+
+    def _batch_base_scores(self):
+        """Discounted UCB per tried item, and the score untried items start above"""
+        scores = np.zeros(len(self.content_items), dtype=np.float32)
+        tried = ~self.untried
+        if tried.any():
+            reward_sums, attempt_counts = self.decayed()
+            counts = np.maximum(attempt_counts[tried], MIN_DISCOUNTED_ATTEMPTS)
+            scores[tried] = reward_sums[tried] / counts + self.exploration_param * np.sqrt(
+                2 * np.log(self.discounted_total) / counts
+            )
+        explore_floor = scores[tried].max() + 1 if tried.any() else 0.0
+        return scores, explore_floor
+
+
+class ShardedBanditRecommender:
+    """
+    UCB bandit with separate arm statistics per (course, learning preference) segment
+
+    Every shard is one row of the same 2-D reward and attempt arrays, found
+    through a key -> row map, so thousands of segments cost two arrays rather
+    than thousands of objects. Row 0 holds the global statistics and every
+    update lands there as well as in its segment's row; segment rows are
+    created on their first update. Shards with fewer than
+    COLD_SHARD_ATTEMPTS attempts recommend from the global row, and warm
+    shards shrink each item's average towards its global average by
+    prior_strength pseudo-attempts.
+    """
+
+    def __init__(self, content_items, exploration_param=0.2, shard_fields=SHARD_FIELDS,
+                 cold_shard_attempts=COLD_SHARD_ATTEMPTS, prior_strength=1.0):
+        self.content_items = list(content_items)
+        self.exploration_param = exploration_param
+        self.shard_fields = shard_fields
+        self.cold_shard_attempts = cold_shard_attempts
+        self.prior_strength = prior_strength
+        self.item_index = {item: i for i, item in enumerate(self.content_items)}
+        self.shard_row = {}  # shard key -> row in the statistics arrays
+        self.reward_sums = np.zeros((1, len(self.content_items)))
+        self.attempt_counts = np.zeros((1, len(self.content_items)), dtype=np.int64)
+        self.shard_totals = np.zeros(1, dtype=np.int64)
+        self.shard_count = 1  # rows in use, including the global row
+        # Items never tried in any shard
+        self.untried = np.ones(len(self.content_items), dtype=bool)
+        self.untried_count = len(self.content_items)
+        self.lock = threading.Lock()  # see MultiArmedBanditRecommender
+
+    def shard_key(self, student_profile):
+        """Segment of a student profile, or None if it names no segment"""
+        key = tuple((student_profile or {}).get(field) for field in self.shard_fields)
+        return key if any(value is not None for value in key) else None
+
+    def _add_shard(self, key):
+        if self.shard_count == len(self.shard_totals):
+            # Grow the arrays geometrically so adding shards is amortized O(items)
+            grow = len(self.shard_totals)
+            self.reward_sums = np.concatenate([self.reward_sums, np.zeros((grow, len(self.content_items)))])
+            self.attempt_counts = np.concatenate(
+                [self.attempt_counts, np.zeros((grow, len(self.content_items)), dtype=np.int64)]
+            )
+            self.shard_totals = np.concatenate([self.shard_totals, np.zeros(grow, dtype=np.int64)])
+        row = self.shard_count
+        self.shard_row[key] = row
+        self.shard_count += 1
+        return row
+
+    def _scoring_row(self, student_profile):
+        """Row to recommend from: the student's shard if warm, else the global row"""
+        row = self.shard_row.get(self.shard_key(student_profile), 0)
+        return row if self.shard_totals[row] >= self.cold_shard_attempts else 0
+
+    def _row_scores(self, row, columns=slice(None)):
+        """UCB of the given items (all tried) from one statistics row, shrunk towards the global row"""
+        global_counts = self.attempt_counts[0, columns]
+        if row == 0:
+            return self.reward_sums[0, columns] / global_counts + self.exploration_param * np.sqrt(
+                2 * np.log(self.shard_totals[0]) / global_counts
+            )
+        counts = self.attempt_counts[row, columns] + self.prior_strength
+        average_rewards = (
+            self.reward_sums[row, columns] + self.prior_strength * self.reward_sums[0, columns] / global_counts
+        ) / counts
+        return average_rewards + self.exploration_param * np.sqrt(2 * np.log(self.shard_totals[row]) / counts)
+
+    def ucb_scores(self, student_profile=None):
+        """
+        Upper confidence bound for every item in the student's shard (all items must have been tried)
+        """
+        return self._row_scores(self._scoring_row(student_profile))
+
+    def get_recommendation(self, student_profile=None):
+        """
+        Get content recommendation for a student
+        Using UCB over the student's segment, or the global statistics for a cold segment
+        """
+        with self.lock:
+            if self.untried_count:
+                return self.content_items[np.random.choice(np.flatnonzero(self.untried))]
+            return self.content_items[int(np.argmax(self.ucb_scores(student_profile)))]
+
+    def update_reward(self, item, reward, student_profile=None):
+        """
+        Update the global and segment statistics after a student interaction
+        """
+        with self.lock:
+            index = self.item_index[item]
+            key = self.shard_key(student_profile)
+            rows = [0]
+            if key is not None:
+                row = self.shard_row.get(key)
+                rows.append(self._add_shard(key) if row is None else row)
+            for row in rows:
+                self.reward_sums[row, index] += reward
+                self.attempt_counts[row, index] += 1
+                self.shard_totals[row] += 1
+            if self.untried[index]:
+                self.untried[index] = False
+                self.untried_count -= 1
+
+    def apply_rewards(self, indices, rewards, student_profiles=None):
+        """
+        Apply a batch of rewards given as item indices (repeats accumulate)
+        Every event updates the global row; with student_profiles (one per
+        event) it also updates its segment's row, as update_reward() does.
+        """
+        with self.lock:
+            rows = np.zeros(len(indices), dtype=np.int64)
+            if student_profiles is not None:
+                for n, profile in enumerate(student_profiles):
+                    key = self.shard_key(profile)
+                    if key is not None:
+                        row = self.shard_row.get(key)
+                        rows[n] = self._add_shard(key) if row is None else row
+            segmented = rows > 0
+            rows = np.concatenate([np.zeros(len(indices), dtype=np.int64), rows[segmented]])
+            columns = np.concatenate([indices, indices[segmented]])
+            np.add.at(self.reward_sums, (rows, columns), np.concatenate([rewards, rewards[segmented]]))
+            np.add.at(self.attempt_counts, (rows, columns), 1)
+            np.add.at(self.shard_totals, rows, 1)
+            if self.untried_count:
+                self.untried[indices] = False
+                self.untried_count = int(self.untried.sum())
+
+    def _batch_base_scores(self, row):
+        """UCB per tried item from one statistics row, and the score untried items start above"""
+        scores = np.zeros(len(self.content_items), dtype=np.float32)
+        tried = ~self.untried
+        if tried.any():
+            scores[tried] = self._row_scores(row, tried)
+        explore_floor = scores[tried].max() + 1 if tried.any() else 0.0
+        return scores, explore_floor
+
+    def recommend_batch(self, student_ids, k=3, consumed=None, rng=None, student_profiles=None):
+        """
+        Top-k recommendations for many students in one call
+
+        Students are grouped by the row they score from (their warm segment,
+        else the global row; student_profiles maps student id -> profile) and
+        each group is ranked like MultiArmedBanditRecommender.recommend_batch.
+        Returns {student_id: [items, best first]}.
+        """
+        with self.lock:
+            student_ids = list(student_ids)
+            student_profiles = student_profiles or {}
+            groups = {}
+            for student_id in student_ids:
+                groups.setdefault(self._scoring_row(student_profiles.get(student_id)), []).append(student_id)
+            rng = rng or np.random.default_rng()
+            recommendations = {}
+            for row, group in groups.items():
+                recommendations.update(ucb_batch(self, *self._batch_base_scores(row), group, k, consumed, rng))
+            return {student_id: recommendations[student_id] for student_id in student_ids}
+
+    def stats(self):
+        """Shard count, how many are still cold, and bytes held by the statistics arrays"""
+        totals = self.shard_totals[1:self.shard_count]
+        return {
+            "shards": self.shard_count - 1,
+            "cold_shards": int((totals < self.cold_shard_attempts).sum()),
+            "bytes": self.reward_sums.nbytes + self.attempt_counts.nbytes + self.shard_totals.nbytes,
+        }
+
+
+class ThompsonSamplingRecommender:
+    """
+    Thompson sampling bandit for content recommendation
+
+    Posteriors are kept as arrays: Beta(successes, failures) for 0/1
+    rewards, or a Normal posterior over each item's mean for graded
+    rewards. Each request draws one sample per item in a single
+    vectorized call and recommends the best draw.
+    """
+
+    def __init__(self, content_items, reward_type="bernoulli", prior_mean=0.5, prior_strength=1.0,
+                 rng=None):
+        if reward_type not in ("bernoulli", "gaussian"):
+            raise ValueError(f"Unknown reward type: {reward_type}")
+        self.content_items = list(content_items)
+        self.reward_type = reward_type
+        self.rng = rng or np.random.default_rng()
+        self.item_index = {item: i for i, item in enumerate(self.content_items)}
+        n = len(self.content_items)
+        # Beta posterior parameters (prior Beta(1, 1))
+        self.alpha = np.ones(n)
+        self.beta = np.ones(n)
+        # Normal posterior: prior_strength pseudo-observations at prior_mean
+        self.prior_mean = prior_mean
+        self.prior_strength = prior_strength
+        self.counts = np.zeros(n)
+        self.reward_sums = np.zeros(n)
+        self.reward_squares = np.zeros(n)
+        self.lock = threading.Lock()  # see MultiArmedBanditRecommender
+
+    def sample_scores(self, size=None, rng=None):
+        """Draw from every item's posterior; size adds leading dimensions (e.g. students)"""
+        rng = rng or self.rng
+        shape = (size, len(self.content_items)) if size is not None else None
+        if self.reward_type == "bernoulli":
+            return rng.beta(self.alpha, self.beta, size=shape)
+        strength = self.prior_strength + self.counts
+        mean = (self.prior_strength * self.prior_mean + self.reward_sums) / strength
+        # Per-item reward variance, shrunk towards a unit-interval prior of 1/12
+        variance = (self.reward_squares - self.counts * mean ** 2 + self.prior_strength / 12) / strength
+        return rng.normal(mean, np.sqrt(np.maximum(variance, 1e-6) / strength), size=shape)
+
+    def get_recommendation(self, student_profile=None):
+        """
+        Get content recommendation for a student
+        Using Thompson sampling
+        """
+        with self.lock:
+            return self.content_items[int(np.argmax(self.sample_scores()))]
+
+    def update_reward(self, item, reward):
+        """
+        Update the reward for an item after a student interaction
+        """
+        with self.lock:
+            index = self.item_index[item]
+            if self.reward_type == "bernoulli":
+                self.alpha[index] += reward
+                self.beta[index] += 1 - reward
+            else:
+                self.counts[index] += 1
+                self.reward_sums[index] += reward
+                self.reward_squares[index] += reward * reward
+
+    def apply_rewards(self, indices, rewards):
+        """
+        Apply a batch of rewards given as item indices (repeats accumulate)
+        """
+        with self.lock:
+            if self.reward_type == "bernoulli":
+                np.add.at(self.alpha, indices, rewards)
+                np.add.at(self.beta, indices, 1 - rewards)
+            else:
+                np.add.at(self.counts, indices, 1)
+                np.add.at(self.reward_sums, indices, rewards)
+                np.add.at(self.reward_squares, indices, rewards * rewards)
+
+    def recommend_batch(self, student_ids, k=3, consumed=None, rng=None):
+        """
+        Top-k recommendations for many students in one call
+
+        Draws a students x items matrix of posterior samples (one call per
+        block of BATCH_BLOCK_ROWS students), masks consumed items and picks
+        each row's top k with argpartition. Samples come from rng when given,
+        else from the recommender's own generator.
+        Returns {student_id: [items, best first]}.
+        """
+        student_ids = list(student_ids)
+        k = min(k, len(self.content_items))
+        if k == 0:
+            return {student_id: [] for student_id in student_ids}
+        indptr, indices = consumed_mask(self.item_index, student_ids, consumed or {})
+        items = np.array(self.content_items, dtype=object)
+
+        recommendations = {}
+        for start in range(0, len(student_ids), BATCH_BLOCK_ROWS):
+            stop = min(start + BATCH_BLOCK_ROWS, len(student_ids))
+            with self.lock:
+                scores = self.sample_scores(size=stop - start, rng=rng)
+            block_rows = np.repeat(np.arange(stop - start), np.diff(indptr[start:stop + 1]))
+            scores[block_rows, indices[indptr[start]:indptr[stop]]] = -np.inf
+            top, valid = top_k(scores, k)
+            for row, student_id in enumerate(student_ids[start:stop]):
+                recommendations[student_id] = items[top[row][valid[row]]].tolist()
+        return recommendations
+
+
+def context_vector(student_profile):
+    """
+    Context features for a student: a bias term, one-hot learning
+    preferences and scaled interaction features (missing values are 0)
+    """
+    student_profile = student_profile or {}
+    features = [1.0]
+    for field, options in PREFERENCE_OPTIONS.items():
+        value = student_profile.get(field)
+        features.extend(1.0 if value == option else 0.0 for option in options)
+    for field, scale in INTERACTION_FEATURES.items():
+        features.append(min(float(student_profile.get(field) or 0) / scale, 1.0))
+    return np.array(features)
+
+
+CONTEXT_DIM = len(context_vector(None))
+
+
+class LinUCBRecommender:
+    """
+    Contextual bandit (disjoint LinUCB) for content recommendation
+
+    Each item has its own ridge regression from student context to reward.
+    Inverse design matrices are updated in place with Sherman-Morrison, so
+    an update costs O(d^2) no matter how many items there are and no matrix
+    is ever inverted. Items never updated share the prior (A^-1 = I / ridge,
+    theta = 0) and one score, so only items with feedback hold a matrix and
+    scoring costs O(d^2) per such item plus O(1) for the rest.
+    """
+
+    def __init__(self, content_items, alpha=1.0, ridge=1.0):
+        self.content_items = list(content_items)
+        self.alpha = alpha
+        self.ridge = ridge
+        self.item_index = {item: i for i, item in enumerate(self.content_items)}
+        # Item index -> row in the model arrays, or -1 while it has no feedback
+        self.model_row = np.full(len(self.content_items), -1, dtype=np.int64)
+        self.model_items = np.zeros(0, dtype=np.int64)
+        self.a_inv = np.zeros((0, CONTEXT_DIM, CONTEXT_DIM))
+        self.b = np.zeros((0, CONTEXT_DIM))
+        self.theta = np.zeros((0, CONTEXT_DIM))  # a_inv @ b, kept current per update
+        self.model_count = 0
+
+    def _add_model(self, index):
+        """Give an item its own model row, starting from the prior"""
+        if self.model_count == len(self.a_inv):
+            # Grow the arrays geometrically so adding rows is amortized O(d^2)
+            capacity = max(16, 2 * len(self.a_inv))
+            grow = capacity - len(self.a_inv)
+            self.a_inv = np.concatenate([self.a_inv, np.zeros((grow, CONTEXT_DIM, CONTEXT_DIM))])
+            self.b = np.concatenate([self.b, np.zeros((grow, CONTEXT_DIM))])
+            self.theta = np.concatenate([self.theta, np.zeros((grow, CONTEXT_DIM))])
+            self.model_items = np.concatenate([self.model_items, np.zeros(grow, dtype=np.int64)])
+        row = self.model_count
+        self.a_inv[row] = np.eye(CONTEXT_DIM) / self.ridge
+        self.model_items[row] = index
+        self.model_row[index] = row
+        self.model_count += 1
+        return row
+
+    def ucb_scores(self, student_profile=None):
+        """Expected reward plus confidence width for every item in one context"""
+        x = context_vector(student_profile)
+        scores = np.full(len(self.content_items), self.alpha * np.sqrt(x @ x / self.ridge))
+        n = self.model_count
+        if n:
+            a_inv_x = self.a_inv[:n] @ x
+            scores[self.model_items[:n]] = self.theta[:n] @ x + self.alpha * np.sqrt(np.maximum(a_inv_x @ x, 0))
+        return scores
+
+    def get_recommendation(self, student_profile=None):
+        """
+        Get content recommendation for a student
+        Using LinUCB over the student's context
+        """
+        return self.content_items[int(np.argmax(self.ucb_scores(student_profile)))]
+
+    def update_reward(self, item, reward, student_profile=None):
+        """
+        Update an item's model after a student interaction in the given context
+        """
+        index = self.item_index[item]
+        row = self.model_row[index]
+        if row < 0:
+            row = self._add_model(index)
+        x = context_vector(student_profile)
+        a_inv = self.a_inv[row]
+        a_inv_x = a_inv @ x
+        # Sherman-Morrison: (A + x x^T)^-1 = A^-1 - A^-1 x x^T A^-1 / (1 + x^T A^-1 x)
+        a_inv -= np.outer(a_inv_x, a_inv_x) / (1.0 + x @ a_inv_x)
+        self.b[row] += reward * x
+        self.theta[row] = a_inv @ self.b[row]
+
+
+def _collaborative_filtering(content_items):
+    # Imported on use, so loading the bandits does not pull in scipy.sparse
+    from modules.collaborative_filtering import ImplicitALSRecommender
+    return ImplicitALSRecommender(content_items)
+
+
+# Recommenders selectable through the "Algorithm Type" system setting
+RECOMMENDER_ALGORITHMS = {
+    "Multi-armed Bandit": MultiArmedBanditRecommender,
+    "Discounted UCB (non-stationary)": DiscountedUCBRecommender,
+    "Segmented Bandit (course x learning preference)": ShardedBanditRecommender,
+    "Thompson Sampling": ThompsonSamplingRecommender,
+    "Contextual Bandit (LinUCB)": LinUCBRecommender,
+    "Collaborative Filtering": _collaborative_filtering,
+}
+if RECOMMENDER_ALGORITHM not in RECOMMENDER_ALGORITHMS:
+    # Unknown RECOMMENDER_ALGORITHM setting; use the default rather than failing later
+    RECOMMENDER_ALGORITHM = "Multi-armed Bandit"
+
+
+def create_recommender(algorithm, content_items, exploration_param=EXPLORATION_PARAM, state_store=None):
+    """Build the recommender for an "Algorithm Type" setting"""
+    if algorithm not in RECOMMENDER_ALGORITHMS:
+        raise ValueError(f"Unknown recommender algorithm: {algorithm}")
+    if algorithm == "Multi-armed Bandit":
+        return MultiArmedBanditRecommender(content_items, exploration_param, state_store=state_store)
+    if algorithm in ("Discounted UCB (non-stationary)", "Segmented Bandit (course x learning preference)"):
+        return RECOMMENDER_ALGORITHMS[algorithm](content_items, exploration_param)
+    return RECOMMENDER_ALGORITHMS[algorithm](content_items)
+
+
+_recommender = None
+_recommender_settings = {"algorithm": RECOMMENDER_ALGORITHM, "exploration_param": EXPLORATION_PARAM}
+_recommender_lock = threading.Lock()
+
+
+def recommender_settings():
+    """The algorithm and exploration rate the active recommender is built with"""
+    with _recommender_lock:
+        return dict(_recommender_settings)
+
+
+def configure_recommender(algorithm, exploration_param=EXPLORATION_PARAM):
+    """Select the active recommender's algorithm; it is rebuilt on the next get_recommender()"""
+    global _recommender
+    if algorithm not in RECOMMENDER_ALGORITHMS:
+        raise ValueError(f"Unknown recommender algorithm: {algorithm}")
+    with _recommender_lock:
+        _recommender_settings.update(algorithm=algorithm, exploration_param=exploration_param)
+        _recommender = None
+
+
+def get_recommender(content_items):
+    """Return the process-wide recommender, building it over content_items from the current settings"""
+    global _recommender
+    with _recommender_lock:
+        if _recommender is None:
+            _recommender = create_recommender(
+                _recommender_settings["algorithm"], content_items, _recommender_settings["exploration_param"]
+            )
+        return _recommender
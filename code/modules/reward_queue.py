@@ -0,0 +1,187 @@
+# reward_queue.py
+import time
+import inspect
+import threading
+from collections import deque
+import numpy as np
+
+MAX_BATCH_SIZE = 1024  # events applied per micro-batch
+MAX_BATCH_WAIT = 0.05  # seconds an event may wait for its batch to fill
+MAX_QUEUE_DEPTH = 100_000  # pending events before submit() applies back-pressure
+LATENCY_WINDOW = 256  # recent batches kept for the apply latency percentiles
+
+
+class RewardIngestionQueue:
+    """
+    Asynchronous reward ingestion for a recommender
+
+    submit() only appends the event to a pending buffer, so UI actions never
+    wait on the bandit state. A background thread takes the whole buffer
+    once it holds MAX_BATCH_SIZE events or its oldest event is MAX_BATCH_WAIT
+    seconds old, and hands it to the recommender's apply_rewards() as one
+    vectorized (np.add.at) update. When MAX_QUEUE_DEPTH events are pending,
+    submit() waits up to its timeout for room and otherwise drops the event.
+    Recommenders whose apply_rewards() takes student_profiles (segmented
+    bandits) also get each event's student_profile. The recommenders apply
+    a batch under their own lock, which their reads also take, so request
+    threads never see a batch half-applied.
+    """
+
+    def __init__(self, recommender, max_batch_size=MAX_BATCH_SIZE, max_batch_wait=MAX_BATCH_WAIT,
+                 max_depth=MAX_QUEUE_DEPTH):
+        if not hasattr(recommender, "apply_rewards"):
+            raise TypeError(f"{type(recommender).__name__} does not support batched rewards")
+        self.recommender = recommender
+        self._takes_profiles = "student_profiles" in inspect.signature(recommender.apply_rewards).parameters
+        self.max_batch_size = max_batch_size
+        self.max_batch_wait = max_batch_wait
+        self.max_depth = max_depth
+        self._lock = threading.Lock()
+        self._not_empty = threading.Condition(self._lock)  # wakes the applier
+        self._not_full = threading.Condition(self._lock)  # wakes blocked submitters and flush()
+        self._indices = []
+        self._rewards = []
+        self._profiles = []
+        self._oldest = None  # monotonic time of the oldest pending event
+        self._applying = 0
+        self._flushing = False
+        self._stopped = False
+        # Metrics
+        self.submitted = 0
+        self.applied = 0
+        self.dropped = 0
+        self.failed = 0
+        self.batches = 0
+        self.peak_depth = 0
+        self._latencies = deque(maxlen=LATENCY_WINDOW)
+        self._thread = threading.Thread(target=self._run, name="reward-ingestion", daemon=True)
+        self._thread.start()
+
+    def submit(self, item, reward, timeout=0.0, student_profile=None):
+        """
+        Queue a reward without applying it
+        Returns False if the queue stayed full for timeout seconds (the event is dropped)
+        """
+        index = self.recommender.item_index[item]
+        with self._lock:
+            if len(self._indices) >= self.max_depth and timeout:
+                deadline = time.monotonic() + timeout
+                while len(self._indices) >= self.max_depth and not self._stopped:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._not_full.wait(remaining)
+            if self._stopped or len(self._indices) >= self.max_depth:
+                self.dropped += 1
+                return False
+            if not self._indices:
+                self._oldest = time.monotonic()
+                self._not_empty.notify()
+            self._indices.append(index)
+            self._rewards.append(reward)
+            if self._takes_profiles:
+                self._profiles.append(student_profile)
+            self.submitted += 1
+            depth = len(self._indices)
+            if depth > self.peak_depth:
+                self.peak_depth = depth
+            if depth == self.max_batch_size:
+                self._not_empty.notify()
+        return True
+
+    def _next_batch(self):
+        """Wait for a full or stale batch and take it; None once stopped and drained"""
+        with self._lock:
+            while True:
+                if self._indices and (
+                    len(self._indices) >= self.max_batch_size
+                    or self._flushing
+                    or self._stopped
+                    or time.monotonic() - self._oldest >= self.max_batch_wait
+                ):
+                    break
+                if self._stopped:
+                    return None
+                if self._indices:
+                    self._not_empty.wait(self._oldest + self.max_batch_wait - time.monotonic())
+                else:
+                    self._not_empty.wait()
+            batch = (self._indices, self._rewards, self._profiles, self._oldest)
+            self._indices, self._rewards, self._profiles, self._oldest = [], [], [], None
+            self._applying = len(batch[0])
+            self._not_full.notify_all()
+            return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+            indices, rewards, profiles, oldest = batch
+            extra = {"student_profiles": profiles} if self._takes_profiles else {}
+            start = time.monotonic()
+            try:
+                self.recommender.apply_rewards(
+                    np.array(indices, dtype=np.int64), np.array(rewards, dtype=float), **extra
+                )
+                failed = 0
+            except Exception:
+                failed = len(indices)
+            end = time.monotonic()
+            with self._lock:
+                self.applied += len(indices) - failed
+                self.failed += failed
+                self.batches += 1
+                # Time to apply the batch, and how long its oldest event waited in all
+                self._latencies.append((end - start, end - oldest))
+                self._applying = 0
+                self._not_full.notify_all()
+
+    def flush(self, timeout=None):
+        """Apply everything submitted so far; returns False on timeout"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._lock:
+            self._flushing = True
+            self._not_empty.notify()
+            try:
+                while self._indices or self._applying:
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        return False
+                    self._not_full.wait(remaining)
+            finally:
+                self._flushing = False
+        return True
+
+    def stop(self):
+        """Apply pending events and stop the background thread; later submits are dropped"""
+        with self._lock:
+            self._stopped = True
+            self._not_empty.notify()
+            self._not_full.notify_all()
+        self._thread.join()
+
+    def stats(self):
+        """Queue depth, throughput counters and apply latency percentiles (ms)"""
+        with self._lock:
+            latencies = np.array(self._latencies).reshape(-1, 2) * 1000
+            stats = {
+                "depth": len(self._indices),
+                "in_flight": self._applying,
+                "peak_depth": self.peak_depth,
+                "max_depth": self.max_depth,
+                "submitted": self.submitted,
+                "applied": self.applied,
+                "dropped": self.dropped,
+                "failed": self.failed,
+                "batches": self.batches,
+            }
+        if len(latencies):
+            apply_ms, event_ms = latencies[:, 0], latencies[:, 1]
+            stats.update({
+                "apply_ms_p50": float(np.percentile(apply_ms, 50)),
+                "apply_ms_p95": float(np.percentile(apply_ms, 95)),
+                "apply_ms_max": float(apply_ms.max()),
+                "event_ms_p95": float(np.percentile(event_ms, 95)),
+            })
+        return stats
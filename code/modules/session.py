@@ -1,10 +1,228 @@
 # session.py
 import streamlit as st
 from datetime import datetime, timedelta
+import time
 import uuid
+import threading
+from modules.jwt_auth import revoke_token
 
 # Session configuration
 SESSION_TIMEOUT = 30  # minutes
+REAP_INTERVAL = 5.0  # seconds between background sweeps for expired sessions
+
+# Session age histogram buckets (upper bound in minutes, label)
+SESSION_AGE_BUCKETS = [
+    (5, "< 5 min"),
+    (15, "5-15 min"),
+    (30, "15-30 min"),
+    (60, "30-60 min"),
+    (120, "1-2 h"),
+    (None, "2 h+"),
+]
+
+
+class TimingWheel:
+    """
+    Hierarchical timing wheel
+
+    Each level has `slots` slots; a slot on level L covers slots**L ticks.
+    Keys are placed on the lowest level whose range covers their deadline
+    and cascade down a level as the wheel turns, so scheduling and
+    cancelling are O(1) and expiry costs O(1) per tick plus the keys that
+    fire.
+    """
+
+    def __init__(self, tick=1.0, slots=64, levels=3, now=0.0):
+        self.tick = tick
+        self.slots = slots
+        self.levels = levels
+        self._wheels = [[set() for _ in range(slots)] for _ in range(levels)]
+        self._deadlines = {}  # key -> deadline tick
+        self._where = {}  # key -> (level, slot)
+        self._current = int(now / tick)
+
+    def __len__(self):
+        return len(self._deadlines)
+
+    def _place(self, key, deadline):
+        delta = deadline - self._current
+        for level in range(self.levels):
+            if delta < self.slots ** (level + 1) or level == self.levels - 1:
+                break
+        # Deadlines past the top level's range park in its furthest slot and
+        # are re-placed when that slot cascades
+        target = min(deadline, self._current + self.slots ** self.levels - 1)
+        slot = (target // self.slots ** level) % self.slots
+        self._wheels[level][slot].add(key)
+        self._where[key] = (level, slot)
+
+    def schedule(self, key, when):
+        """(Re)schedule key to expire at time `when`"""
+        self.cancel(key)
+        deadline = max(-int(-when // self.tick), self._current + 1)
+        self._deadlines[key] = deadline
+        self._place(key, deadline)
+
+    def cancel(self, key):
+        where = self._where.pop(key, None)
+        if where is not None:
+            level, slot = where
+            self._wheels[level][slot].discard(key)
+            del self._deadlines[key]
+
+    def advance(self, now):
+        """Turn the wheel up to time `now` and return the keys that expired"""
+        target = int(now / self.tick)
+        if not self._deadlines:
+            self._current = max(self._current, target)
+            return []
+        expired = []
+        while self._current < target and self._deadlines:
+            self._current += 1
+            # Cascade higher levels whose slot boundary we just crossed
+            for level in range(self.levels - 1, 0, -1):
+                span = self.slots ** level
+                if self._current % span == 0:
+                    slot = (self._current // span) % self.slots
+                    keys = self._wheels[level][slot]
+                    self._wheels[level][slot] = set()
+                    for key in keys:
+                        self._place(key, self._deadlines[key])
+            slot = self._current % self.slots
+            keys = self._wheels[0][slot]
+            self._wheels[0][slot] = set()
+            for key in keys:
+                del self._where[key]
+                del self._deadlines[key]
+                expired.append(key)
+        self._current = max(self._current, target)
+        return expired
+
+
+class SessionRegistry:
+    """
+    Process-wide registry of live sessions keyed by session_id
+
+    Every rerun touches its session, pushing its expiry SESSION_TIMEOUT
+    into the future on a timing wheel. Sessions that go idle are reaped,
+    whether or not they ever rerun again, and their per-session data is
+    freed: the session's token is revoked (dropping it from the verified-
+    token cache) and any registered cleanups run.
+    """
+
+    def __init__(self, timeout=SESSION_TIMEOUT * 60, clock=time.monotonic):
+        self.timeout = timeout
+        self.clock = clock
+        self._sessions = {}  # session_id -> {created, last_seen, role, token, cleanups}
+        self._wheel = TimingWheel(now=clock())
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._reaper = None
+        self.expired = 0
+
+    def touch(self, session_id, role=None, token=None):
+        """
+        Record activity for a session, registering it if unknown
+
+        Returns True if the session was already live, False if it is new
+        (or had expired and was reaped).
+        """
+        now = self.clock()
+        expired = self._reap(now)
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            was_live = entry is not None
+            if entry is None:
+                entry = {"created": now, "cleanups": []}
+                self._sessions[session_id] = entry
+            entry.update(last_seen=now, role=role, token=token)
+            self._wheel.schedule(session_id, now + self.timeout)
+        self._free(expired)
+        return was_live
+
+    def add_cleanup(self, session_id, cleanup):
+        """Run `cleanup()` when the session expires or ends"""
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is not None:
+                entry["cleanups"].append(cleanup)
+
+    def remove(self, session_id):
+        """End a session now, freeing its data; returns False if unknown"""
+        with self._lock:
+            entry = self._sessions.pop(session_id, None)
+            self._wheel.cancel(session_id)
+        if entry is None:
+            return False
+        self._free([entry])
+        return True
+
+    def _reap(self, now):
+        with self._lock:
+            expired = [self._sessions.pop(session_id) for session_id in self._wheel.advance(now)]
+            self.expired += len(expired)
+        return expired
+
+    def _free(self, entries):
+        for entry in entries:
+            if entry["token"]:
+                revoke_token(entry["token"])
+            for cleanup in entry["cleanups"]:
+                cleanup()
+
+    def reap(self):
+        """Expire idle sessions; returns how many were reaped"""
+        expired = self._reap(self.clock())
+        self._free(expired)
+        return len(expired)
+
+    def stats(self):
+        """Live session counts by role plus a histogram of session ages"""
+        self.reap()
+        now = self.clock()
+        by_role = {}
+        ages = {label: 0 for _, label in SESSION_AGE_BUCKETS}
+        with self._lock:
+            for entry in self._sessions.values():
+                role = entry["role"] or "anonymous"
+                by_role[role] = by_role.get(role, 0) + 1
+                minutes = (now - entry["created"]) / 60
+                for bound, label in SESSION_AGE_BUCKETS:
+                    if bound is None or minutes < bound:
+                        ages[label] += 1
+                        break
+            live = len(self._sessions)
+        return {"live": live, "expired": self.expired, "by_role": by_role, "age_histogram": ages}
+
+    def start_reaper(self, interval=REAP_INTERVAL):
+        """Start the background thread that reaps abandoned sessions"""
+        if self._reaper is not None:
+            return
+
+        def run():
+            while not self._stop.wait(interval):
+                self.reap()
+
+        self._reaper = threading.Thread(target=run, name="session-reaper", daemon=True)
+        self._reaper.start()
+
+    def stop(self):
+        self._stop.set()
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_session_registry():
+    """Return the process-wide session registry, starting its reaper"""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = SessionRegistry()
+                _registry.start_reaper()
+    return _registry
 
 
 def initialize_session():
@@ -12,11 +230,22 @@ def initialize_session():
     if "session_id" not in st.session_state:
         st.session_state.session_id = str(uuid.uuid4())
 
-    if "last_activity" not in st.session_state:
-        st.session_state.last_activity = datetime.now()
-    else:
-        # Update last activity time
-        st.session_state.last_activity = datetime.now()
+    # A logged-in session the registry has already reaped stays expired
+    was_live = get_session_registry().touch(
+        st.session_state.session_id,
+        role=st.session_state.get("role"),
+        token=st.session_state.get("token"),
+    )
+    if st.session_state.get("logged_in") and not was_live:
+        st.session_state.session_expired = True
+
+    # Update last activity time
+    st.session_state.last_activity = datetime.now()
+
+
+def add_session_cleanup(cleanup):
+    """Run `cleanup()` when the current session expires or ends"""
+    get_session_registry().add_cleanup(st.session_state.session_id, cleanup)
 
 
 def check_session_valid():
@@ -24,6 +253,9 @@ def check_session_valid():
     if "last_activity" not in st.session_state:
         return False
 
+    if st.session_state.get("session_expired"):
+        return False
+
     # Check if session has timed out
     time_elapsed = datetime.now() - st.session_state.last_activity
     if time_elapsed > timedelta(minutes=SESSION_TIMEOUT):
@@ -34,5 +266,9 @@ def check_session_valid():
 
 def end_session():
     """End the current session"""
+    # Removing the session from the registry revokes its token
+    removed = "session_id" in st.session_state and get_session_registry().remove(st.session_state.session_id)
+    if not removed and "token" in st.session_state:
+        revoke_token(st.session_state.token)
     for key in list(st.session_state.keys()):
         del st.session_state[key]
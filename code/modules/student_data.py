@@ -317,3 +317,16 @@ def get_student_profile(username):
 def get_all_real_students():
     """Get all real student profiles"""
     return REAL_STUDENTS
+
+
+# Demo class rosters: each class's teacher and enrolled students
+CLASS_ROSTERS = {
+    'Engineering 101': {'teacher': 'teacher1', 'students': ['student1', 'student2', 'student3']},
+    'Data Science Basics': {'teacher': 'teacher1', 'students': ['student1', 'student3']},
+    'Advanced AI': {'teacher': 'teacher1', 'students': ['student2']},
+}
+
+
+def get_class_rosters():
+    """Get all class rosters"""
+    return CLASS_ROSTERS
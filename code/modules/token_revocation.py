@@ -0,0 +1,217 @@
+# token_revocation.py
+import os
+import math
+import time
+import sqlite3
+import hashlib
+import threading
+from modules.user_store import DATA_DIR
+
+REVOCATIONS_DB = os.path.join(DATA_DIR, "revocations.db")
+
+# How stale a process's view of revocations made elsewhere may get
+REVOCATION_SYNC_INTERVAL = 2.0  # seconds
+BLOOM_CAPACITY = 100000  # revoked tokens before the filter is resized
+BLOOM_ERROR_RATE = 0.01
+
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter over strings
+
+    Lookups answer "definitely not present" or "maybe present"; a maybe is
+    confirmed against the revocation store.
+    """
+
+    def __init__(self, capacity=BLOOM_CAPACITY, error_rate=BLOOM_ERROR_RATE):
+        self.capacity = capacity
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item):
+        # Double hashing: k positions from two 64-bit halves of one digest
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hash_count)]
+
+    def add(self, item):
+        for pos in self._positions(item):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, item):
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+
+class TokenRevocationStore:
+    """
+    Persisted token deny-list plus per-user token versions
+
+    A token is revoked if its jti is on the deny-list or its "ver" claim is
+    older than the user's current token version (bumped on password change
+    or account removal). State lives in SQLite so every app process shares
+    it and it survives restarts. Each process mirrors it in memory, with
+    a Bloom filter over revoked jtis, and pulls new entries from a change
+    log at most every REVOCATION_SYNC_INTERVAL seconds, so the common
+    "not revoked" check does no store lookup.
+    """
+
+    def __init__(self, path=REVOCATIONS_DB, sync_interval=REVOCATION_SYNC_INTERVAL):
+        self.path = path
+        self.sync_interval = sync_interval
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._bloom = BloomFilter()
+        self._user_versions = {}
+        self._last_seq = 0
+        self._last_sync = 0.0
+        self.bloom_checks = 0
+        self.store_lookups = 0
+        conn = self._connect()
+        with conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS revoked_tokens (jti TEXT PRIMARY KEY, expires_at INTEGER)")
+            conn.execute("CREATE TABLE IF NOT EXISTS token_versions (username TEXT PRIMARY KEY, version INTEGER NOT NULL)")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS revocation_log (
+                    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                    kind TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    value INTEGER
+                )
+                """
+            )
+        self._load()
+
+    def _load(self):
+        """Build the in-memory view from the tables after pruning expired entries"""
+        self.prune_expired()
+        conn = self._connect()
+        with self._lock:
+            self._user_versions = dict(conn.execute("SELECT username, version FROM token_versions"))
+            (self._last_seq,) = conn.execute("SELECT COALESCE(MAX(seq), 0) FROM revocation_log").fetchone()
+            self._last_sync = time.monotonic()
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _sync(self, force=False):
+        """Pull revocations recorded (by any process) since the last sync"""
+        now = time.monotonic()
+        if not force and now - self._last_sync < self.sync_interval:
+            return
+        with self._lock:
+            rows = self._connect().execute(
+                "SELECT seq, kind, key, value FROM revocation_log WHERE seq > ? ORDER BY seq",
+                (self._last_seq,),
+            ).fetchall()
+            for seq, kind, key, value in rows:
+                if kind == "jti":
+                    if self._bloom.count >= self._bloom.capacity:
+                        self._rebuild_bloom(self._bloom.capacity * 2)
+                    self._bloom.add(key)
+                else:
+                    self._user_versions[key] = max(value, self._user_versions.get(key, 0))
+                self._last_seq = seq
+            self._last_sync = now
+
+    def _rebuild_bloom(self, capacity):
+        bloom = BloomFilter(capacity=capacity)
+        for (jti,) in self._connect().execute("SELECT jti FROM revoked_tokens"):
+            bloom.add(jti)
+        self._bloom = bloom
+
+    def user_version(self, username):
+        """Current token version for a user (claims below it are revoked)"""
+        self._sync()
+        return self._user_versions.get(username, 0)
+
+    def is_revoked(self, payload):
+        """Check a verified token payload against the deny-list and user version"""
+        self._sync()
+        if payload.get("ver", 0) < self._user_versions.get(payload.get("username"), 0):
+            return True
+        jti = payload.get("jti")
+        if jti is None:
+            return False
+        self.bloom_checks += 1
+        if jti not in self._bloom:
+            return False
+        # Possible false positive; confirm against the store
+        self.store_lookups += 1
+        row = self._connect().execute("SELECT 1 FROM revoked_tokens WHERE jti = ?", (jti,)).fetchone()
+        return row is not None
+
+    def revoke_token(self, jti, expires_at):
+        """Deny a single token until it would have expired anyway"""
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                "INSERT OR IGNORE INTO revoked_tokens (jti, expires_at) VALUES (?, ?)", (jti, int(expires_at))
+            )
+            conn.execute("INSERT INTO revocation_log (kind, key) VALUES ('jti', ?)", (jti,))
+        self._sync(force=True)
+
+    def revoke_user_tokens(self, username):
+        """Revoke every token issued to a user so far by bumping their version"""
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                """
+                INSERT INTO token_versions (username, version) VALUES (?, 1)
+                ON CONFLICT(username) DO UPDATE SET version = version + 1
+                """,
+                (username,),
+            )
+            (version,) = conn.execute(
+                "SELECT version FROM token_versions WHERE username = ?", (username,)
+            ).fetchone()
+            conn.execute(
+                "INSERT INTO revocation_log (kind, key, value) VALUES ('user', ?, ?)", (username, version)
+            )
+        self._sync(force=True)
+        return version
+
+    def prune_expired(self):
+        """Forget deny-list entries for tokens that have expired on their own"""
+        conn = self._connect()
+        with conn:
+            conn.execute("DELETE FROM revoked_tokens WHERE expires_at < ?", (int(time.time()),))
+            conn.execute(
+                "DELETE FROM revocation_log WHERE kind = 'jti' "
+                "AND key NOT IN (SELECT jti FROM revoked_tokens)"
+            )
+        with self._lock:
+            self._rebuild_bloom(self._bloom.capacity)
+
+    def stats(self):
+        return {
+            "revoked_tokens": self._bloom.count,
+            "users_revoked": len(self._user_versions),
+            "bloom_checks": self.bloom_checks,
+            "store_lookups": self.store_lookups,
+        }
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_revocation_store():
+    """Return the process-wide token revocation store"""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = TokenRevocationStore()
+    return _store
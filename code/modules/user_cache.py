@@ -0,0 +1,93 @@
+# user_cache.py
+import threading
+from modules.user_store import get_user_store
+
+
+class UserTable:
+    """
+    Immutable snapshot of the user table with precomputed lookup indexes
+    """
+
+    def __init__(self, users_df, version):
+        self.users = users_df
+        self.version = version
+        self.by_username = {name: pos for pos, name in enumerate(users_df["username"])}
+        self.by_role = {
+            role: positions.tolist()
+            for role, positions in users_df.groupby("role", sort=False).indices.items()
+        }
+
+    def get_user(self, username):
+        """Return a user row as a dict, or None if not found"""
+        pos = self.by_username.get(username)
+        if pos is None:
+            return None
+        return self.users.iloc[pos].to_dict()
+
+    def count_by_role(self, role):
+        return len(self.by_role.get(role, []))
+
+    def users_with_role(self, role):
+        return self.users.iloc[self.by_role.get(role, [])]
+
+
+class UserCache:
+    """
+    Process-wide cache of the user table shared by all Streamlit sessions
+
+    The snapshot is keyed by the store's version token (file mtime for CSV, a
+    version counter for SQLite), so writes from other processes are picked up
+    on the next read. Write paths in this process call invalidate() directly.
+    """
+
+    def __init__(self, store=None):
+        self.store = store
+        self._lock = threading.Lock()
+        self._table = None
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def _get_store(self):
+        return self.store if self.store is not None else get_user_store()
+
+    def get(self):
+        """Return the current UserTable, reloading only if the store changed"""
+        store = self._get_store()
+        version = store.version()
+        table = self._table
+        if table is not None and table.version == version:
+            self.hits += 1
+            return table
+        with self._lock:
+            # Another session may have reloaded while we waited for the lock
+            if self._table is not None and self._table.version == version:
+                self.hits += 1
+                return self._table
+            self.misses += 1
+            # Read the version before the data so a concurrent write forces a reload
+            self._table = UserTable(store.load_all(), version)
+            return self._table
+
+    def invalidate(self):
+        """Drop the cached snapshot after a write"""
+        with self._lock:
+            self._table = None
+            self.invalidations += 1
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+
+_cache = UserCache()
+
+
+def get_user_cache():
+    """Return the process-wide user cache"""
+    return _cache
@@ -0,0 +1,83 @@
+# user_export.py
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from modules.user_store import USER_COLUMNS, get_user_store
+from modules.login_log import get_login_log
+
+# Password hashes never leave the store
+EXPORT_COLUMNS = [col for col in USER_COLUMNS if col != "password"]
+EXPORT_CHUNK_SIZE = 10000
+EXPORT_FORMATS = ["CSV", "Parquet"]
+# Roles the User Management page lists; admin accounts are never listed or exported
+LISTED_ROLES = ["teacher", "student"]
+
+# Exports run on a small shared pool so a large export never blocks a script run
+_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="user-export")
+
+
+def _write_csv(chunks, path):
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        for i, chunk in enumerate(chunks):
+            chunk.to_csv(f, index=False, header=(i == 0))
+
+
+def _write_parquet(chunks, path):
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ValueError("Parquet export requires pyarrow to be installed")
+
+    schema = pa.schema([(col, pa.string()) for col in EXPORT_COLUMNS])
+    with pq.ParquetWriter(path, schema) as writer:
+        for chunk in chunks:
+            chunk = chunk.astype(object).where(chunk.notna(), None)
+            writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+
+
+def export_users(fmt="CSV", chunk_size=EXPORT_CHUNK_SIZE, roles=LISTED_ROLES):
+    """
+    Stream the users with the given roles (without password hashes) to a temporary file
+
+    Rows are read and written chunk_size at a time, so memory stays bounded
+    regardless of the number of users. Returns the path of the written file;
+    the caller is responsible for removing it.
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format: {fmt}")
+
+    suffix = ".csv" if fmt == "CSV" else ".parquet"
+    fd, path = tempfile.mkstemp(prefix="users_export_", suffix=suffix)
+    os.close(fd)
+    login_log = get_login_log()
+    chunks = (
+        login_log.merge_into(chunk[chunk["role"].isin(roles)])
+        for chunk in get_user_store().iter_chunks(chunk_size, columns=EXPORT_COLUMNS)
+    )
+    try:
+        if fmt == "CSV":
+            _write_csv(chunks, path)
+        else:
+            _write_parquet(chunks, path)
+    except Exception:
+        os.remove(path)
+        raise
+    return path
+
+
+def start_export(fmt="CSV", chunk_size=EXPORT_CHUNK_SIZE, roles=LISTED_ROLES):
+    """Run export_users() in the background and return its Future"""
+    return _executor.submit(export_users, fmt, chunk_size, roles)
+
+
+def discard_export(job):
+    """Delete an export's file once its job has finished"""
+    def remove(future):
+        if future.exception() is None:
+            try:
+                os.remove(future.result())
+            except FileNotFoundError:
+                pass
+
+    job.add_done_callback(remove)
@@ -0,0 +1,136 @@
+# user_search.py
+import threading
+import numpy as np
+from modules.user_cache import get_user_cache
+
+# Rebuild from scratch once this fraction of indexed entries is stale
+REBUILD_THRESHOLD = 0.25
+
+
+def _trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class UserSearchIndex:
+    """
+    Trigram index over username and email for case-insensitive substring search
+
+    Each indexed user gets an integer id; posting lists map trigrams to ids.
+    When the user table changes only added or edited users are (re)indexed,
+    and removed or edited entries are tombstoned until the next rebuild.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._clear()
+        self.version = None
+
+    def _clear(self):
+        self._keys = []  # id -> "username\temail" in lower case
+        self._usernames = []
+        self._roles = []
+        self._alive = []
+        self._role_codes = {}
+        self._ids = {}  # username -> live id
+        self._postings = {}  # trigram -> list of ids
+        self._stale = 0
+        self._alive_arr = np.zeros(0, dtype=bool)
+        self._role_arr = np.zeros(0, dtype=np.int16)
+
+    def _add(self, username, email, role):
+        uid = len(self._keys)
+        key = f"{username}\t{email}".lower()
+        self._keys.append(key)
+        self._usernames.append(username)
+        self._roles.append(self._role_codes.setdefault(role, len(self._role_codes)))
+        self._alive.append(True)
+        self._ids[username] = uid
+        for gram in _trigrams(key):
+            self._postings.setdefault(gram, []).append(uid)
+
+    def _remove(self, username):
+        uid = self._ids.pop(username)
+        self._alive[uid] = False
+        self._stale += 1
+
+    def sync(self, table):
+        """Bring the index up to date with a UserTable snapshot"""
+        if table.version == self.version:
+            return
+        with self._lock:
+            if table.version == self.version:
+                return
+            users = table.users
+            current = {
+                username: (email if isinstance(email, str) else "", role)
+                for username, email, role in zip(users["username"], users["email"], users["role"])
+            }
+            if self._stale > REBUILD_THRESHOLD * max(len(self._keys), 1):
+                self._clear()
+            # Tombstone users that were removed or whose email/role changed
+            for username in list(self._ids):
+                uid = self._ids[username]
+                entry = current.get(username)
+                if entry is None or (
+                    entry[0].lower() != self._keys[uid].split("\t", 1)[1]
+                    or self._role_codes.get(entry[1]) != self._roles[uid]
+                ):
+                    self._remove(username)
+            for username, (email, role) in current.items():
+                if username not in self._ids:
+                    self._add(username, email, role)
+            # Array views for vectorized role/liveness filtering at query time
+            self._alive_arr = np.array(self._alive, dtype=bool)
+            self._role_arr = np.array(self._roles, dtype=np.int16)
+            self.version = table.version
+
+    def search(self, term, roles=None, offset=0, limit=50):
+        """
+        Return (usernames, total) for users matching term, in index order
+
+        An empty term matches everyone; roles restricts to the given roles.
+        """
+        term = term.strip().lower()
+        with self._lock:
+            mask = self._alive_arr.copy()
+            if roles is not None:
+                allowed = np.zeros(len(self._role_codes), dtype=bool)
+                allowed[[self._role_codes[role] for role in roles if role in self._role_codes]] = True
+                mask &= allowed[self._role_arr]
+
+            if len(term) >= 3:
+                # The rarest trigram's posting list bounds the candidates; the
+                # substring check below is cheaper than intersecting the rest
+                rarest = min(
+                    (self._postings.get(gram, []) for gram in _trigrams(term)), key=len
+                )
+                candidates = np.array(rarest, dtype=np.int64)
+                candidates = candidates[mask[candidates]]
+            else:
+                candidates = np.flatnonzero(mask)
+
+            if term:
+                # Trigrams only narrow the candidates; confirm the actual substring
+                keys = self._keys
+                matches = [uid for uid in candidates.tolist() if term in keys[uid]]
+            else:
+                matches = candidates
+            page = [self._usernames[uid] for uid in matches[offset:offset + limit]]
+        return page, len(matches)
+
+
+_index = UserSearchIndex()
+
+
+def search_users(term, roles=None, offset=0, limit=50):
+    """
+    Search the cached user table by username/email substring
+
+    Returns (page_df, total) where page_df holds at most `limit` rows
+    starting at `offset`.
+    """
+    table = get_user_cache().get()
+    _index.sync(table)
+    usernames, total = _index.search(term, roles, offset, limit)
+    positions = [table.by_username[name] for name in usernames if name in table.by_username]
+    return table.users.iloc[positions], total
@@ -0,0 +1,416 @@
+# user_store.py
+import os
+import sqlite3
+import threading
+import pandas as pd
+from dotenv import load_dotenv
+from modules.migrations import LATEST_SCHEMA_VERSION, apply_migrations, run_migrations
+from modules.password_hasher import hash_password
+
+# Get the data directory path relative to this module
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data")
+USERS_CSV = os.path.join(DATA_DIR, "users.csv")
+USERS_DB = os.path.join(DATA_DIR, "users.db")
+
+# Select the storage backend ("sqlite" or "csv" for small installs)
+load_dotenv()
+USER_STORE_BACKEND = os.getenv("USER_STORE_BACKEND", "sqlite")
+
+USER_COLUMNS = [
+    "username",
+    "password",
+    "role",
+    "email",
+    "last_login",
+]
+
+
+def default_users():
+    """Initial user table with the default admin account"""
+    return pd.DataFrame(
+        {
+            "username": ["admin"],
+            "password": [hash_password("admin123")],
+            "role": ["admin"],
+            "email": ["admin@example.com"],
+            "last_login": [None],
+        }
+    )
+
+
+def _to_record(row):
+    """Convert a row mapping to a plain dict with None for missing values"""
+    return {col: (None if pd.isna(row.get(col)) else row.get(col)) for col in USER_COLUMNS}
+
+
+class UserStore:
+    """
+    Interface for user account storage
+    """
+
+    def load_all(self):
+        """Return the full user table as a DataFrame"""
+        raise NotImplementedError
+
+    def load_raw(self):
+        """Return the user table with every stored column, for migrations"""
+        return self.load_all()
+
+    def replace_all(self, users_df):
+        """Overwrite the full user table"""
+        raise NotImplementedError
+
+    def iter_chunks(self, chunk_size, columns=USER_COLUMNS):
+        """Yield the user table as DataFrames of at most chunk_size rows"""
+        raise NotImplementedError
+
+    def get_user(self, username):
+        """Return a single user record as a dict, or None if not found"""
+        raise NotImplementedError
+
+    def user_exists(self, username):
+        """Check whether a username is taken"""
+        return self.get_user(username) is not None
+
+    def add_user(self, record):
+        """Insert a new user, returning False if the username already exists"""
+        raise NotImplementedError
+
+    def add_users(self, records):
+        """Insert many new users in one write, skipping taken usernames; returns the count added"""
+        raise NotImplementedError
+
+    def update_user(self, username, **fields):
+        """Update the given columns for one user, returning False if not found"""
+        raise NotImplementedError
+
+    def update_users(self, updates):
+        """Apply {username: {column: value}} updates in one write"""
+        for username, fields in updates.items():
+            self.update_user(username, **fields)
+
+    def version(self):
+        """Return a token that changes whenever the stored users change"""
+        raise NotImplementedError
+
+    def schema_version(self):
+        """Return the schema version stamped on the stored data (0 if unknown)"""
+        raise NotImplementedError
+
+    def set_schema_version(self, version):
+        raise NotImplementedError
+
+
+class CsvUserStore(UserStore):
+    """
+    Whole-file CSV storage, suitable for small installs
+    """
+
+    def __init__(self, path=USERS_CSV):
+        self.path = path
+        # A CSV has no room for metadata, so the schema stamp lives alongside it
+        self.schema_path = os.path.splitext(path)[0] + ".schema_version"
+        self._lock = threading.Lock()
+
+    def load_all(self):
+        if not os.path.exists(self.path):
+            # Create default admin user if file doesn't exist
+            users = default_users()
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            users.to_csv(self.path, index=False)
+            self.set_schema_version(LATEST_SCHEMA_VERSION)
+            return users
+        # Legacy columns are upgraded once by run_migrations(), not on every read
+        return pd.read_csv(self.path)
+
+    def replace_all(self, users_df):
+        users_df.to_csv(self.path, index=False)
+
+    def iter_chunks(self, chunk_size, columns=USER_COLUMNS):
+        if not os.path.exists(self.path):
+            self.load_all()
+        for chunk in pd.read_csv(self.path, chunksize=chunk_size, dtype=str):
+            yield chunk.reindex(columns=columns)
+
+    def schema_version(self):
+        if not os.path.exists(self.path):
+            return LATEST_SCHEMA_VERSION
+        try:
+            with open(self.schema_path, encoding="utf-8") as f:
+                return int(f.read().strip())
+        except (FileNotFoundError, ValueError):
+            return 0
+
+    def set_schema_version(self, version):
+        with open(self.schema_path, "w", encoding="utf-8") as f:
+            f.write(f"{version}\n")
+
+    def version(self):
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def get_user(self, username):
+        users = self.load_all()
+        user_row = users[users["username"] == username]
+        if user_row.empty:
+            return None
+        return _to_record(user_row.iloc[0])
+
+    def add_user(self, record):
+        with self._lock:
+            users = self.load_all()
+            if record["username"] in users["username"].values:
+                return False
+            new_user = pd.DataFrame([{col: record.get(col) for col in USER_COLUMNS}])
+            self.replace_all(pd.concat([users, new_user], ignore_index=True))
+            return True
+
+    def add_users(self, records):
+        with self._lock:
+            users = self.load_all()
+            existing = set(users["username"])
+            new_users = []
+            for record in records:
+                if record["username"] not in existing:
+                    existing.add(record["username"])
+                    new_users.append({col: record.get(col) for col in USER_COLUMNS})
+            if new_users:
+                self.replace_all(pd.concat([users, pd.DataFrame(new_users)], ignore_index=True))
+            return len(new_users)
+
+    def update_user(self, username, **fields):
+        with self._lock:
+            users = self.load_all()
+            mask = users["username"] == username
+            if not mask.any():
+                return False
+            for col, value in fields.items():
+                # Empty columns are read back as float NaN; widen before assigning text
+                users[col] = users[col].astype(object)
+                users.loc[mask, col] = value
+            self.replace_all(users)
+            return True
+
+    def update_users(self, updates):
+        with self._lock:
+            users = self.load_all()
+            index = dict(zip(users["username"], users.index))
+            for username, fields in updates.items():
+                if username not in index:
+                    continue
+                for col, value in fields.items():
+                    users[col] = users[col].astype(object)
+                    users.at[index[username], col] = value
+            self.replace_all(users)
+
+
+class SqliteUserStore(UserStore):
+    """
+    Indexed SQLite storage (WAL mode) with point lookups and single-row writes
+    """
+
+    def __init__(self, path=USERS_DB, import_csv=USERS_CSV):
+        self.path = path
+        self.import_csv = import_csv
+        self._local = threading.local()
+        self._init_schema()
+
+    def _connect(self):
+        # sqlite3 connections cannot be shared across threads, and Streamlit
+        # runs each session's script on its own thread
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _init_schema(self):
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS users (
+                    username TEXT PRIMARY KEY,
+                    password TEXT NOT NULL,
+                    role TEXT NOT NULL,
+                    email TEXT,
+                    last_login TEXT
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_users_role ON users(role)")
+            conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+            conn.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('version', '0')")
+
+            # One-time import from the existing CSV (or seed the default admin).
+            # The CSV may predate any schema stamp, so bring it fully up to date.
+            imported = conn.execute("SELECT value FROM meta WHERE key = 'csv_imported'").fetchone()
+            if imported is None:
+                if self.import_csv and os.path.exists(self.import_csv):
+                    users = apply_migrations(pd.read_csv(self.import_csv))
+                else:
+                    users = default_users()
+                self._insert_rows(conn, users, replace=True)
+                self._bump_version(conn)
+                conn.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('csv_imported', '1')")
+                conn.execute(
+                    "INSERT OR REPLACE INTO meta (key, value) VALUES ('schema_version', ?)",
+                    (str(LATEST_SCHEMA_VERSION),),
+                )
+
+    def _insert_rows(self, conn, users_df, replace=False):
+        verb = "INSERT OR REPLACE" if replace else "INSERT"
+        placeholders = ", ".join("?" for _ in USER_COLUMNS)
+        rows = [
+            tuple(record[col] for col in USER_COLUMNS)
+            for record in (_to_record(row) for row in users_df.to_dict("records"))
+        ]
+        conn.executemany(
+            f"{verb} INTO users ({', '.join(USER_COLUMNS)}) VALUES ({placeholders})", rows
+        )
+
+    @staticmethod
+    def _bump_version(conn):
+        # Called inside every write transaction so readers in any process can
+        # detect changes with a single point read
+        conn.execute("UPDATE meta SET value = CAST(value AS INTEGER) + 1 WHERE key = 'version'")
+
+    def version(self):
+        row = self._connect().execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+        return int(row[0])
+
+    def schema_version(self):
+        row = self._connect().execute("SELECT value FROM meta WHERE key = 'schema_version'").fetchone()
+        return int(row[0]) if row is not None else 0
+
+    def set_schema_version(self, version):
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('schema_version', ?)", (str(version),)
+            )
+
+    def load_all(self):
+        conn = self._connect()
+        return pd.read_sql_query(f"SELECT {', '.join(USER_COLUMNS)} FROM users ORDER BY rowid", conn)
+
+    def load_raw(self):
+        # Databases created before a migration may still hold retired columns
+        return pd.read_sql_query("SELECT * FROM users ORDER BY rowid", self._connect())
+
+    def iter_chunks(self, chunk_size, columns=USER_COLUMNS):
+        # A dedicated connection keeps the read snapshot independent of
+        # writes made on this thread's shared connection
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            yield from pd.read_sql_query(
+                f"SELECT {', '.join(columns)} FROM users ORDER BY rowid", conn, chunksize=chunk_size
+            )
+        finally:
+            conn.close()
+
+    def replace_all(self, users_df):
+        conn = self._connect()
+        with conn:
+            conn.execute("DELETE FROM users")
+            self._insert_rows(conn, users_df)
+            self._bump_version(conn)
+
+    def get_user(self, username):
+        row = self._connect().execute(
+            f"SELECT {', '.join(USER_COLUMNS)} FROM users WHERE username = ?", (username,)
+        ).fetchone()
+        return dict(row) if row is not None else None
+
+    def user_exists(self, username):
+        row = self._connect().execute("SELECT 1 FROM users WHERE username = ?", (username,)).fetchone()
+        return row is not None
+
+    def add_user(self, record):
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute(
+                    f"INSERT INTO users ({', '.join(USER_COLUMNS)}) VALUES ({', '.join('?' for _ in USER_COLUMNS)})",
+                    tuple(record.get(col) for col in USER_COLUMNS),
+                )
+                self._bump_version(conn)
+        except sqlite3.IntegrityError:
+            return False
+        return True
+
+    def add_users(self, records):
+        conn = self._connect()
+        with conn:
+            before = conn.total_changes
+            conn.executemany(
+                f"INSERT OR IGNORE INTO users ({', '.join(USER_COLUMNS)}) VALUES ({', '.join('?' for _ in USER_COLUMNS)})",
+                (tuple(record.get(col) for col in USER_COLUMNS) for record in records),
+            )
+            added = conn.total_changes - before
+            self._bump_version(conn)
+        return added
+
+    def update_user(self, username, **fields):
+        unknown = set(fields) - set(USER_COLUMNS)
+        if unknown:
+            raise ValueError(f"Unknown user columns: {', '.join(sorted(unknown))}")
+        if not fields:
+            return self.user_exists(username)
+        assignments = ", ".join(f"{col} = ?" for col in fields)
+        conn = self._connect()
+        with conn:
+            cursor = conn.execute(
+                f"UPDATE users SET {assignments} WHERE username = ?",
+                (*fields.values(), username),
+            )
+            self._bump_version(conn)
+        return cursor.rowcount > 0
+
+    def update_users(self, updates):
+        conn = self._connect()
+        with conn:
+            for username, fields in updates.items():
+                if not fields:
+                    continue
+                unknown = set(fields) - set(USER_COLUMNS)
+                if unknown:
+                    raise ValueError(f"Unknown user columns: {', '.join(sorted(unknown))}")
+                assignments = ", ".join(f"{col} = ?" for col in fields)
+                conn.execute(
+                    f"UPDATE users SET {assignments} WHERE username = ?",
+                    (*fields.values(), username),
+                )
+            self._bump_version(conn)
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def create_user_store():
+    """Open a store for the configured backend without running migrations"""
+    if USER_STORE_BACKEND == "csv":
+        return CsvUserStore()
+    elif USER_STORE_BACKEND == "sqlite":
+        return SqliteUserStore()
+    raise ValueError(f"Unknown USER_STORE_BACKEND: {USER_STORE_BACKEND}")
+
+
+def get_user_store():
+    """Return the process-wide user store, migrated to the latest schema on first use"""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                store = create_user_store()
+                run_migrations(store)
+                _store = store
+    return _store
@@ -1 +1,25 @@
 # pages module
+import importlib
+
+# Navigation label -> (module, render function). Page modules pull in heavy
+# dependencies (plotly, streamlit_calendar, mock data), so they are only
+# imported the first time one of their pages is shown.
+PAGE_REGISTRY = {
+    "Dashboard": ("pages.common.dashboard", "display_dashboard"),
+    "User Management": ("pages.admin.user_management", "display_user_management"),
+    "System Settings": ("pages.admin.system_settings", "display_system_settings"),
+    "Class Management": ("pages.teacher.class_management", "display_class_management"),
+    "Student Progress": ("pages.teacher.student_progress", "display_student_progress"),
+    "Content Management": ("pages.teacher.content_management", "display_content_management"),
+    "Analytics": ("pages.teacher.analytics", "display_analytics"),
+    "My Learning Path": ("pages.student.learning_path", "display_learning_path"),
+    "Performance": ("pages.student.performance", "display_student_performance"),
+    "Schedule": ("pages.student.schedule", "display_schedule"),
+    "Resources": ("pages.student.resources", "display_resources"),
+}
+
+
+def load_page(label):
+    """Return a page's render function, importing its module on first use"""
+    module_name, function_name = PAGE_REGISTRY[label]
+    return getattr(importlib.import_module(module_name), function_name)
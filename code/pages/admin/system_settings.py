@@ -1,5 +1,9 @@
 # system_settings.py - System settings page for admins
 import streamlit as st
+from modules.migrations import LATEST_SCHEMA_VERSION, run_migrations
+from modules.user_store import get_user_store
+from modules.user_cache import get_user_cache
+from modules.recommender import RECOMMENDER_ALGORITHMS, configure_recommender, recommender_settings
 
 
 def display_system_settings():
@@ -41,11 +45,14 @@ def display_system_settings():
         st.subheader("AI Configuration")
 
         st.markdown("### Recommendation Engine")
+        recommender = recommender_settings()
         col1, col2 = st.columns(2)
 
         with col1:
-            st.selectbox("Algorithm Type", ["Multi-armed Bandit", "Collaborative Filtering", "Content-based Filtering", "Hybrid"])
-            st.slider("Exploration Rate", 0.0, 1.0, 0.2)
+            algorithms = list(RECOMMENDER_ALGORITHMS)
+            algorithm = st.selectbox("Algorithm Type", algorithms, index=algorithms.index(recommender["algorithm"]))
+            exploration_param = st.slider("Exploration Rate", 0.0, 1.0, float(recommender["exploration_param"]),
+                                          help="Used by the UCB bandits")
             st.number_input("Minimum Data Points Required", value=10)
             st.checkbox("Allow Real-time Updates", value=True)
 
@@ -75,7 +82,9 @@ def display_system_settings():
         st.checkbox("Enable Automated Retraining", value=True)
         st.checkbox("Send Alert on Performance Degradation", value=True)
 
-        st.button("Save AI Settings")
+        if st.button("Save AI Settings"):
+            configure_recommender(algorithm, exploration_param)
+            st.success(f"Recommendations now use {algorithm}")
 
     with tab3:
         st.subheader("Integration Settings")
@@ -130,6 +139,18 @@ def display_system_settings():
             st.text_area("Maintenance Message", "System will be undergoing scheduled maintenance...")
             st.number_input("Estimated Downtime (hours)", value=2)
 
+        st.markdown("### User Store Schema")
+        user_store = get_user_store()
+        st.write(f"Schema version: {user_store.schema_version()} (latest: {LATEST_SCHEMA_VERSION})")
+        if st.button("Run Schema Migrations"):
+            steps = run_migrations(user_store)
+            if steps:
+                get_user_cache().invalidate()
+                for step in steps:
+                    st.success(f"v{step['version']}: {step['description']} ({step['seconds'] * 1000:.1f} ms)")
+            else:
+                st.info("User store is already up to date")
+
         st.markdown("### System Logs")
         st.selectbox("Log Level", ["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"])
         st.number_input("Log Retention (days)", value=14)
@@ -1,35 +1,53 @@
 # user_management.py - User management page for admins
 import streamlit as st
-from modules.auth import load_users, create_user
+import pandas as pd
+from modules.auth import create_user, revoke_user_sessions
+from modules.bulk_import import import_users_csv
+from modules.user_export import EXPORT_FORMATS, LISTED_ROLES, discard_export, start_export
+from modules.login_log import get_login_log
+from modules.user_search import search_users
+from modules.session import add_session_cleanup
+
+PAGE_SIZE_OPTIONS = [25, 50, 100]
 
 
 def display_user_management():
     """Admin page for managing users"""
     st.title("User Management")
 
-    users = load_users()
-    # Filter out admin from display for security
-    display_users = users[users['role'] != 'admin'].copy()
-
-    # Add view options
+    # Add view options (admin accounts are never listed, for security)
     view_option = st.radio("View", ["All Users", "Teachers", "Students"])
 
     if view_option == "Teachers":
-        filtered_users = display_users[display_users['role'] == 'teacher']
+        roles = ['teacher']
     elif view_option == "Students":
-        filtered_users = display_users[display_users['role'] == 'student']
+        roles = ['student']
     else:
-        filtered_users = display_users
+        roles = LISTED_ROLES
 
-    # Add search functionality
+    # Add search functionality, served from the in-memory search index
     search_term = st.text_input("Search Users", "")
-    if search_term:
-        filtered_users = filtered_users[
-            filtered_users['username'].str.contains(search_term, case=False) |
-            filtered_users['email'].str.contains(search_term, case=False)
-        ]
 
-    st.dataframe(filtered_users[['username', 'role', 'email', 'last_login']])
+    col1, col2 = st.columns(2)
+    with col1:
+        page_size = st.selectbox("Rows per page", PAGE_SIZE_OPTIONS, index=1)
+    with col2:
+        page_number = st.number_input("Page", min_value=1, value=1, step=1)
+
+    offset = (page_number - 1) * page_size
+    page_users, total = search_users(search_term, roles=roles, offset=offset, limit=page_size)
+    if total and offset >= total:
+        # Requested page is past the end of the results; show the last page
+        offset = (total - 1) // page_size * page_size
+        page_users, total = search_users(search_term, roles=roles, offset=offset, limit=page_size)
+
+    # Overlay last_login values still pending in the login event log
+    page_users = get_login_log().merge_into(page_users)
+    st.dataframe(page_users[['username', 'role', 'email', 'last_login']])
+    if total:
+        st.caption(f"Showing {offset + 1}-{offset + len(page_users)} of {total} users")
+    else:
+        st.caption("No users found")
 
     # User creation form
     with st.expander("Add New User"):
@@ -48,10 +66,57 @@ def display_user_management():
                 else:
                     st.error(message)
 
+    # Force sign-out, e.g. for a compromised or departing account
+    with st.expander("Revoke User Sessions"):
+        with st.form("revoke_sessions_form"):
+            revoke_username = st.text_input("Username")
+            if st.form_submit_button("Revoke All Sessions"):
+                success, message = revoke_user_sessions(revoke_username)
+                if success:
+                    st.success(message)
+                else:
+                    st.error(message)
+
     # Bulk user operations
     with st.expander("Bulk Operations"):
-        st.file_uploader("Upload User CSV", type=["csv"])
+        uploaded_file = st.file_uploader("Upload User CSV", type=["csv"])
+        if uploaded_file is not None and st.button("Import Users"):
+            try:
+                report = import_users_csv(uploaded_file)
+            except ValueError as e:
+                st.error(f"Import failed: {e}")
+            else:
+                st.success(
+                    f"Imported {report['created']} of {report['rows']} users in "
+                    f"{report['elapsed']:.2f}s ({report['rows_per_sec']:,.0f} rows/sec)"
+                )
+                if report['errors']:
+                    st.warning(f"{len(report['errors'])} rows were skipped")
+                    st.dataframe(pd.DataFrame(report['errors']))
         st.download_button("Download User Template",
                           data="username,email,role,password\nuser1,user1@example.com,student,password1",
                           file_name="user_template.csv")
-        st.button("Export All Users")
+
+        export_format = st.selectbox("Export Format", EXPORT_FORMATS)
+        if st.button("Export All Users"):
+            previous = st.session_state.pop('user_export', None)
+            if previous is not None:
+                discard_export(previous)
+            st.session_state.user_export = start_export(export_format)
+            # Don't leave the file behind if the session is abandoned
+            add_session_cleanup(lambda job=st.session_state.user_export: discard_export(job))
+            st.session_state.user_export_format = export_format
+
+        # The export runs in the background; offer the file once it is written
+        export_job = st.session_state.get('user_export')
+        if export_job is not None:
+            if not export_job.done():
+                st.info("Export in progress...")
+                st.button("Refresh Export Status")
+            elif export_job.exception() is not None:
+                st.error(f"Export failed: {export_job.exception()}")
+            else:
+                extension = "csv" if st.session_state.user_export_format == "CSV" else "parquet"
+                with open(export_job.result(), "rb") as export_file:
+                    st.download_button("Download Export", data=export_file,
+                                      file_name=f"users_export.{extension}")
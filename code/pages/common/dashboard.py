@@ -3,7 +3,9 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 import plotly.express as px
-from modules.auth import load_users
+from modules.user_cache import get_user_cache
+from modules.rate_limiter import get_login_limiter
+from modules.session import get_session_registry
 
 
 def display_dashboard():
@@ -23,10 +25,11 @@ def display_admin_dashboard():
     """Admin dashboard with system overview"""
     st.header("System Overview")
 
-    # Mock data for demonstration
-    users = load_users()
-    student_count = len(users[users['role'] == 'student'])
-    teacher_count = len(users[users['role'] == 'teacher'])
+    # Role counts come from the shared user cache's role index
+    user_cache = get_user_cache()
+    user_table = user_cache.get()
+    student_count = user_table.count_by_role('student')
+    teacher_count = user_table.count_by_role('teacher')
 
     col1, col2, col3 = st.columns(3)
     with col1:
@@ -46,6 +49,33 @@ def display_admin_dashboard():
     health_df = pd.DataFrame(health_data)
     st.dataframe(health_df)
 
+    cache_stats = user_cache.stats()
+    st.caption(
+        f"User cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses "
+        f"({cache_stats['hit_rate']:.0%} hit rate), {cache_stats['invalidations']} invalidations"
+    )
+
+    # Login rate limiter counters
+    limiter_stats = get_login_limiter().stats()
+    st.dataframe(pd.DataFrame([
+        {'Limit': 'Per username', **limiter_stats['username']},
+        {'Limit': 'Per client', **limiter_stats['client']},
+    ]).rename(columns={'allowed': 'Allowed', 'rejected': 'Rejected',
+                       'evictions': 'Evicted Keys', 'tracked_keys': 'Tracked Keys'}))
+
+    # Live sessions from the server-side session registry
+    session_stats = get_session_registry().stats()
+    col1, col2 = st.columns(2)
+    with col1:
+        st.metric("Live Sessions", session_stats['live'])
+        st.caption(", ".join(f"{role}: {count}" for role, count in sorted(session_stats['by_role'].items()))
+                   + f" | {session_stats['expired']} expired")
+    with col2:
+        ages = session_stats['age_histogram']
+        fig = px.bar(x=list(ages.keys()), y=list(ages.values()),
+                     labels={'x': 'Session Age', 'y': 'Sessions'}, title="Session Ages")
+        st.plotly_chart(fig)
+
     # Recent activity
     st.subheader("Recent Activity")
     activity_data = {
@@ -4,13 +4,21 @@ import pandas as pd
 import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
+from collections import Counter
+from modules.data_loader import load_class_preferences, load_classes, load_student_profiles
+from modules.preference_store import PREFERENCE_OPTIONS
+
+LEARNING_PREFERENCES = PREFERENCE_OPTIONS["learning_preference"]
 
 
 def display_student_progress():
     st.title("Student Progress Monitoring")
     
-    # Class selector
-    classes = ["Engineering 101", "Data Science Basics", "Advanced AI"]
+    # Class selector, limited to the teacher's own classes
+    classes = load_classes()
+    if not classes:
+        st.info("You have no classes assigned yet.")
+        return
     selected_class = st.selectbox("Select Class", classes)
     
     # Overview metrics
@@ -32,14 +40,22 @@ def display_student_progress():
     col1, col2 = st.columns([2, 1])
 
     with col1:
-        # Mock class learning style data (in production, aggregate from all students)
-        learning_preferences_count = {
-            "Visual/Interactive": 10,
-            "Reading/Text": 6,
-            "Auditory/Visual": 5,
-            "Kinesthetic/Hands-on": 3,
-            "Mixed": 1
-        }
+        # Aggregate the class roster's saved preferences with one batched read
+        roster_preferences = load_class_preferences(selected_class)
+        learning_preferences_count = dict(Counter(
+            prefs['learning_preference'] for prefs in roster_preferences.values()
+            if prefs['learning_preference'] in LEARNING_PREFERENCES
+        ))
+
+        if not learning_preferences_count:
+            # Mock class learning style data until students save their preferences
+            learning_preferences_count = {
+                "Visual/Interactive": 10,
+                "Reading/Text": 6,
+                "Auditory/Visual": 5,
+                "Kinesthetic/Hands-on": 3,
+                "Mixed": 1
+            }
 
         # Create pie chart
         fig_pie = px.pie(
@@ -53,8 +69,13 @@ def display_student_progress():
 
     with col2:
         st.markdown("### Class Insights")
-        st.metric("Most Common Style", "Visual/Interactive", "40%")
-        st.metric("Least Common Style", "Mixed", "4%")
+        total_count = sum(learning_preferences_count.values())
+        most_common = max(learning_preferences_count, key=learning_preferences_count.get)
+        least_common = min(learning_preferences_count, key=learning_preferences_count.get)
+        st.metric("Most Common Style", most_common,
+                  f"{learning_preferences_count[most_common] / total_count:.0%}")
+        st.metric("Least Common Style", least_common,
+                  f"{learning_preferences_count[least_common] / total_count:.0%}")
 
         st.markdown("### Teaching Strategy")
         st.info("""
@@ -160,11 +181,8 @@ def display_student_progress():
     with col3:
         sort_by = st.selectbox("Sort By", ["Risk (High to Low)", "Progress (Low to High)", "Name"])
     
-    # Import real student data
-    from modules.student_data import get_all_real_students
-
-    # Get real students
-    real_students_data = get_all_real_students()
+    # Get the real students enrolled in this class
+    real_students_data = load_student_profiles(selected_class)
 
     # Create list for real students
     real_student_rows = []